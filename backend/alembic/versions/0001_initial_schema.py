@@ -0,0 +1,70 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-02-08 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("name", sa.String(255)),
+        sa.Column("image", sa.String(500)),
+        sa.Column("tier", sa.String(20), nullable=False),
+        sa.Column("stripe_customer_id", sa.String(255)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "scans",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("url", sa.String(2000), nullable=False),
+        sa.Column("ai_probability", sa.Float, nullable=False),
+        sa.Column("verdict", sa.String(20), nullable=False),
+        sa.Column("analysis", sa.Text),
+        sa.Column("content_snippet", sa.Text),
+        sa.Column("model_used", sa.String(50), nullable=False),
+        sa.Column("tokens_used", sa.Integer),
+        sa.Column("scan_duration_ms", sa.Integer),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_scans_user_id", "scans", ["user_id"])
+
+    op.create_table(
+        "subscriptions",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("stripe_subscription_id", sa.String(255), nullable=False, unique=True),
+        sa.Column("stripe_price_id", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("tier", sa.String(20), nullable=False),
+        sa.Column("current_period_start", sa.DateTime(timezone=True)),
+        sa.Column("current_period_end", sa.DateTime(timezone=True)),
+        sa.Column("cancel_at", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_subscriptions_user_id", "subscriptions", ["user_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("subscriptions")
+    op.drop_table("scans")
+    op.drop_table("users")
@@ -0,0 +1,46 @@
+"""scan history keyset index and per-user scan counter
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite index serves both the user filter and the (created_at, id)
+    # keyset ordering, so the old single-column index is redundant.
+    op.create_index(
+        "ix_scans_user_created_id",
+        "scans",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.drop_index("ix_scans_user_id", table_name="scans")
+
+    op.add_column(
+        "users",
+        sa.Column("scan_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE users SET scan_count = counts.n
+        FROM (SELECT user_id, COUNT(*) AS n FROM scans GROUP BY user_id) AS counts
+        WHERE users.id = counts.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "scan_count")
+    op.create_index("ix_scans_user_id", "scans", ["user_id"])
+    op.drop_index("ix_scans_user_created_id", table_name="scans")
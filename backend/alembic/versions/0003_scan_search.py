@@ -0,0 +1,62 @@
+"""scan search: generated domain/tsvector columns, GIN and trigram indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# Frozen copies of the expressions in app/models/scan.py
+DOMAIN_EXPRESSION = (
+    "regexp_replace(lower(substring(url from '^[A-Za-z][A-Za-z0-9+.-]*://([^/:?#]+)')), "
+    "'^www\\.', '')"
+)
+SEARCH_VECTOR_EXPRESSION = (
+    "to_tsvector('english', "
+    "coalesce(analysis, '') || ' ' || coalesce(content_snippet, ''))"
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated columns are filled for existing rows by the table rewrite
+    op.add_column(
+        "scans",
+        sa.Column("domain", sa.Text, sa.Computed(DOMAIN_EXPRESSION, persisted=True)),
+    )
+    op.add_column(
+        "scans",
+        sa.Column(
+            "search_vector", TSVECTOR,
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        ),
+    )
+
+    op.create_index("ix_scans_user_domain", "scans", ["user_id", "domain"])
+    op.create_index(
+        "ix_scans_search_vector", "scans", ["search_vector"], postgresql_using="gin"
+    )
+    op.create_index(
+        "ix_scans_url_trgm", "scans", ["url"],
+        postgresql_using="gin", postgresql_ops={"url": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scans_url_trgm", table_name="scans")
+    op.drop_index("ix_scans_search_vector", table_name="scans")
+    op.drop_index("ix_scans_user_domain", table_name="scans")
+    op.drop_column("scans", "search_vector")
+    op.drop_column("scans", "domain")
@@ -0,0 +1,129 @@
+"""partition scans by month on created_at
+
+Rebuilds scans as a RANGE-partitioned table with one partition per month,
+from the oldest existing scan through three months ahead.
+Runs in one transaction; expect a table lock for the duration of the copy.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of the expressions in app/models/scan.py
+DOMAIN_EXPRESSION = (
+    "regexp_replace(lower(substring(url from '^[A-Za-z][A-Za-z0-9+.-]*://([^/:?#]+)')), "
+    "'^www\\.', '')"
+)
+SEARCH_VECTOR_EXPRESSION = (
+    "to_tsvector('english', "
+    "coalesce(analysis, '') || ' ' || coalesce(content_snippet, ''))"
+)
+
+COPY_COLUMNS = (
+    "id, user_id, url, ai_probability, verdict, analysis, content_snippet, "
+    "model_used, tokens_used, scan_duration_ms, created_at"
+)
+
+INDEXES = ("ix_scans_user_created_id", "ix_scans_user_domain",
+           "ix_scans_search_vector", "ix_scans_url_trgm")
+
+
+def _scans_columns():
+    return [
+        sa.Column("id", sa.String(36), nullable=False),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("url", sa.String(2000), nullable=False),
+        sa.Column("ai_probability", sa.Float, nullable=False),
+        sa.Column("verdict", sa.String(20), nullable=False),
+        sa.Column("analysis", sa.Text),
+        sa.Column("content_snippet", sa.Text),
+        sa.Column("model_used", sa.String(50), nullable=False),
+        sa.Column("tokens_used", sa.Integer),
+        sa.Column("scan_duration_ms", sa.Integer),
+        sa.Column("domain", sa.Text, sa.Computed(DOMAIN_EXPRESSION, persisted=True)),
+        sa.Column("search_vector", TSVECTOR, sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    ]
+
+
+def _create_indexes():
+    op.create_index(
+        "ix_scans_user_created_id", "scans",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index("ix_scans_user_domain", "scans", ["user_id", "domain"])
+    op.create_index(
+        "ix_scans_search_vector", "scans", ["search_vector"], postgresql_using="gin"
+    )
+    op.create_index(
+        "ix_scans_url_trgm", "scans", ["url"],
+        postgresql_using="gin", postgresql_ops={"url": "gin_trgm_ops"},
+    )
+
+
+def _move_aside():
+    for name in INDEXES:
+        op.drop_index(name, table_name="scans")
+    op.rename_table("scans", "scans_old")
+    op.execute("ALTER TABLE scans_old RENAME CONSTRAINT scans_pkey TO scans_old_pkey")
+
+
+def upgrade() -> None:
+    _move_aside()
+
+    op.create_table(
+        "scans",
+        *_scans_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at", name="scans_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+
+    # One partition per month from the oldest scan to 3 months ahead.
+    # Later months are created by PartitionService.ensure_partitions().
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            m date := date_trunc('month', COALESCE((SELECT min(created_at) FROM scans_old), now()))::date;
+            last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+        BEGIN
+            WHILE m <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF scans FOR VALUES FROM (%L) TO (%L)',
+                    'scans_p' || to_char(m, 'YYYY_MM'), m, (m + interval '1 month')::date
+                );
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END $$
+        """
+    )
+
+    op.execute(f"INSERT INTO scans ({COPY_COLUMNS}) SELECT {COPY_COLUMNS} FROM scans_old")
+    op.drop_table("scans_old")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    _move_aside()
+
+    op.create_table(
+        "scans",
+        *_scans_columns(),
+        sa.PrimaryKeyConstraint("id", name="scans_pkey"),
+    )
+    op.execute(f"INSERT INTO scans ({COPY_COLUMNS}) SELECT {COPY_COLUMNS} FROM scans_old")
+    # Drops the parent and every monthly partition
+    op.drop_table("scans_old")
+    _create_indexes()
@@ -0,0 +1,40 @@
+"""webhook inbox table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_events",
+        sa.Column("id", sa.String(255), primary_key=True),
+        sa.Column("type", sa.String(100), nullable=False),
+        sa.Column("customer_id", sa.String(255)),
+        sa.Column("payload", sa.Text, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer, nullable=False),
+        sa.Column("last_error", sa.Text),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("event_created", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("received_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_webhook_events_due", "webhook_events", ["status", "next_attempt_at"])
+    op.create_index("ix_webhook_events_customer", "webhook_events", ["customer_id", "event_created"])
+
+
+def downgrade() -> None:
+    op.drop_table("webhook_events")
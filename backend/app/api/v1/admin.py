@@ -0,0 +1,31 @@
+"""
+Admin endpoints - operator tooling, internal secret required.
+
+GET /api/v1/admin/profiles         -> List saved request profiles
+GET /api/v1/admin/profiles/{name}  -> Download one profile (HTML)
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core.profiling import list_profiles, profile_path
+from app.core.security import verify_internal_secret
+
+router = APIRouter(dependencies=[Depends(verify_internal_secret)])
+
+
+@router.get("/profiles")
+async def get_profiles():
+    """Profiles captured by ProfilingMiddleware, newest first."""
+    return {"profiles": await asyncio.to_thread(list_profiles)}
+
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str):
+    """Download a pyinstrument HTML profile."""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/html", filename=name)
@@ -3,19 +3,42 @@ Scanner endpoints - AI content detection powered by Claude.
 
 POST /api/v1/scanner/scan    -> Analyze a URL (requires Hunter+)
 GET  /api/v1/scanner/usage   -> Current scan usage
+GET  /api/v1/scanner/usage/tokens -> Token and cost ledger, per day and model
 GET  /api/v1/scanner/history  -> Scan history (requires Hunter+)
+GET  /api/v1/scanner/search   -> Search scan history (requires Hunter+)
+GET  /api/v1/scanner/export   -> Full history download (requires Hunter+)
+GET  /api/v1/scanner/archive  -> Archived months (requires Hunter+)
+GET  /api/v1/scanner/archive/{month} -> Scans from an archived month
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import require_auth, require_tier
-from app.core.rate_limiter import check_scan_limit
-from app.services.scanner_service import scanner_service
+from app.core.metrics import stage
+from app.core.rate_limiter import check_scan_limit, get_scan_usage
+from app.core.pagination import (
+    clamp_limit, decode_cursor, encode_cursor, paginate_scans, split_page,
+)
+from app.core.responses import typed_response
+from app.services.scan_coalescer import scan_coalescer
+from app.services.scan_writer import scan_writer
+from app.services.export_service import export_service, MEDIA_TYPES
+from app.services.search_service import search_service
+from app.services.partition_service import partition_service
+from app.services.usage_ledger import TOKEN_FIELDS, usage_ledger
 from app.models.scan import Scan
-from app.schemas.scan import ScanRequest, ScanResponse, ScanResult, ScanUsage
+from app.models.user import User
+from app.schemas.scan import (
+    SCAN_HISTORY, SCAN_PAGE, SCAN_RESPONSE,
+    ScanHistory, ScanPage, ScanRequest, ScanResponse, ScanSearchParams, TokenUsageReport,
+)
 
 router = APIRouter()
 
@@ -24,71 +47,154 @@ router = APIRouter()
 async def scan_url(
     request: ScanRequest,
     user: dict = Depends(require_tier("hunter")),
-    db: AsyncSession = Depends(get_db),
 ):
     """Analyze a URL for AI-generated content. Requires Hunter tier+."""
-    # Check rate limit
+    # No get_db here on purpose: a pooled connection must not be held
+    # across the model call. The row is written by ScanWriter afterwards.
+
+    # Check token budget, then rate limit (so a refused scan isn't counted)
+    await usage_ledger.check_budget(user["id"], user["tier"])
     usage = await check_scan_limit(user["id"], user["tier"])
 
-    # Run analysis
+    # Run analysis, shared with identical scans already in flight
     try:
-        result = await scanner_service.analyze(str(request.url))
+        result = await scan_coalescer.analyze(str(request.url), user["id"])
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Scan failed: {str(e)}")
 
-    # Save to DB
-    scan = Scan(
-        user_id=user["id"],
-        url=str(request.url),
-        **result,
-    )
-    db.add(scan)
-    await db.flush()
+    # Save to DB (possibly batched, see ScanWriter)
+    row = scan_writer.new_row(user["id"], str(request.url), result)
+    with stage("db_write"):
+        await scan_writer.write(row, durable=request.durable)
 
-    return ScanResponse(
-        result=ScanResult.model_validate(scan),
-        usage=ScanUsage(**usage),
-    )
+    return typed_response(SCAN_RESPONSE, {"result": row, "usage": usage})
 
 
 @router.get("/usage")
 async def get_usage(user: dict = Depends(require_auth)):
     """Get current scan usage for the day."""
-    from app.core.redis import redis_client
-    key = f"scan_count:{user['id']}"
-    current = await redis_client.get_cached(key)
-    used = int(current) if current else 0
-    from app.core.rate_limiter import TIER_LIMITS
-    limit = TIER_LIMITS.get(user["tier"], 0)
-    return {"used": used, "limit": limit, "remaining": max(0, limit - used)}
+    return await get_scan_usage(user["id"], user["tier"])
+
+
+@router.get("/usage/tokens", response_model=TokenUsageReport)
+async def get_token_usage(
+    days: int = Query(30, ge=1, le=366),
+    user: dict = Depends(require_auth),
+    # Primary: a flush deletes the Redis delta before a replica has the rows
+    db: AsyncSession = Depends(get_db),
+):
+    """Model tokens and estimated cost per day and model, from the usage ledger."""
+    entries = await usage_ledger.daily(db, user["id"], days)
+    for entry in entries:
+        entry["cost_usd"] = entry.pop("cost_micros") / 1_000_000
+    return {
+        "budget": await usage_ledger.budget(user["id"], user["tier"]),
+        "days": entries,
+        "total_tokens": sum(e[field] for e in entries for field in TOKEN_FIELDS),
+        "total_cost_usd": round(sum(e["cost_usd"] for e in entries), 6),
+    }
 
 
-@router.get("/history")
+@router.get("/history", response_model=ScanHistory)
 async def get_history(
     limit: int = 20,
-    offset: int = 0,
+    cursor: str | None = None,
     user: dict = Depends(require_tier("hunter")),
+    # Primary, not the replica: a durable scan must show up here immediately
     db: AsyncSession = Depends(get_db),
 ):
-    """Get scan history. Requires Hunter tier+."""
+    """
+    Get scan history, newest first. Requires Hunter tier+.
+    Pass the returned next_cursor back as ?cursor= to fetch the next page.
+    """
+    limit = clamp_limit(limit)
     result = await db.execute(
-        select(Scan)
-        .where(Scan.user_id == user["id"])
-        .order_by(Scan.created_at.desc())
-        .limit(min(limit, 100))
-        .offset(offset)
+        paginate_scans(select(Scan).where(Scan.user_id == user["id"]), cursor, limit)
+    )
+    scans, next_cursor = split_page(list(result.scalars().all()), limit)
+
+    # Total comes from the maintained counter, not COUNT(*)
+    total = await db.scalar(select(User.scan_count).where(User.id == user["id"]))
+
+    return typed_response(SCAN_HISTORY, {
+        "scans": scans,
+        "total": total or 0,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/search", response_model=ScanPage)
+async def search_history(
+    params: Annotated[ScanSearchParams, Query()],
+    user: dict = Depends(require_tier("hunter")),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Search scan history by text, URL, domain, verdict, probability and date.
+    Requires Hunter tier+. Paginates with next_cursor like /history.
+    """
+    scans, next_cursor = await search_service.search(db, user["id"], params)
+    return typed_response(SCAN_PAGE, {
+        "scans": scans,
+        "limit": clamp_limit(params.limit),
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/export")
+async def export_history(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    cursor: str | None = None,
+    user: dict = Depends(require_tier("hunter")),
+):
+    """
+    Stream the full scan history as NDJSON, CSV or Parquet. Requires Hunter tier+.
+    Resume an interrupted NDJSON/CSV download with the last row's cursor.
+    """
+    # Decode up front so a bad cursor is a 400, not a broken stream
+    after = decode_cursor(cursor) if cursor else None
+    return StreamingResponse(
+        export_service.stream(user["id"], format, after),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="scans.{format}"'},
     )
-    scans = result.scalars().all()
 
-    # Total count
-    count_result = await db.execute(
-        select(func.count(Scan.id)).where(Scan.user_id == user["id"])
+
+@router.get("/archive")
+async def list_archive(user: dict = Depends(require_tier("hunter"))):
+    """Months in which the user's scans have moved out of live history into the archive."""
+    months = await partition_service.archived_months(user["id"])
+    return {"months": [m.strftime("%Y-%m") for m in months]}
+
+
+@router.get("/archive/{month}", response_model=ScanPage)
+async def get_archived_month(
+    month: str = Path(pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    limit: int = 20,
+    cursor: str | None = None,
+    user: dict = Depends(require_tier("hunter")),
+):
+    """
+    Scans from an archived month (YYYY-MM), newest first. Requires Hunter tier+.
+    Paginates with next_cursor like /history.
+    """
+    limit = clamp_limit(limit)
+    after = decode_cursor(cursor) if cursor else None
+    # One extra row tells whether there is a next page
+    rows = await partition_service.read_archive(
+        date.fromisoformat(f"{month}-01"), user["id"], limit + 1, after
     )
-    total = count_result.scalar()
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Month not archived")
 
-    return {
-        "scans": [ScanResult.model_validate(s) for s in scans],
-        "total": total,
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"])
+
+    return typed_response(SCAN_PAGE, {
+        "scans": page,
         "limit": limit,
-        "offset": offset,
-    }
+        "next_cursor": next_cursor,
+    })
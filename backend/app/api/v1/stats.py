@@ -9,6 +9,8 @@ GET /api/v1/stats/ticker     -> Ticker tape facts
 """
 
 from fastapi import APIRouter
+
+from app.core.responses import raw_response
 from app.services.stats_service import stats_service
 
 router = APIRouter()
@@ -17,35 +19,35 @@ router = APIRouter()
 @router.get("/")
 async def get_all_stats():
     """Full stats dataset. Public, cached."""
-    return await stats_service.get_stats()
+    return raw_response(await stats_service.get_stats())
 
 
 @router.get("/platforms")
 async def get_platforms():
     """Platform-specific bot/AI percentages."""
     stats = await stats_service.get_stats()
-    return stats.get("platforms", {})
+    return raw_response(stats.get("platforms", {}))
 
 
 @router.get("/timeline")
 async def get_timeline():
     """Historical timeline data for charts."""
     stats = await stats_service.get_stats()
-    return stats.get("timeline", [])
+    return raw_response(stats.get("timeline", []))
 
 
 @router.get("/ticker")
 async def get_ticker():
     """Ticker tape facts for the scrolling bar."""
     stats = await stats_service.get_stats()
-    return stats.get("ticker_facts", [])
+    return raw_response(stats.get("ticker_facts", []))
 
 
 @router.get("/index")
 async def get_dead_index():
     """The Dead Internet Index score."""
     stats = await stats_service.get_stats()
-    return {
+    return raw_response({
         "index": stats.get("dead_internet_index", 0.0),
         "last_updated": stats.get("last_updated"),
-    }
+    })
@@ -7,20 +7,21 @@ POST /api/v1/users/checkout   -> Create Stripe checkout session
 POST /api/v1/users/portal     -> Create Stripe billing portal
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
 
-from app.core.database import get_db
-from app.core.security import require_auth
+from app.core.database import get_db, get_read_db, release
+from app.core.security import require_auth, verify_internal_secret
+from app.core.tiers import tier_resolver
 from app.core.config import settings
 from app.models.user import User
 from app.services.stripe_service import stripe_service
 from app.schemas.user import UserProfile
 
-import stripe
-import secrets
+import time
 
 router = APIRouter()
 
@@ -33,14 +34,19 @@ class UserSyncRequest(BaseModel):
     image: str | None = None
 
 
-async def verify_internal_secret(
-    x_internal_secret: str | None = Header(None, alias="X-Internal-Secret"),
-) -> None:
-    """Verify that the request comes from our NextAuth backend."""
-    if not x_internal_secret:
-        raise HTTPException(status_code=401, detail="Missing internal auth")
-    if not secrets.compare_digest(x_internal_secret, settings.internal_api_secret):
-        raise HTTPException(status_code=403, detail="Invalid internal auth")
+# email -> (user id, (name, image) last written, expiry)
+_recent_syncs: dict[str, tuple[str, tuple[str | None, str | None], float]] = {}
+
+
+def _remember_sync(email: str, user_id: str, profile: tuple[str | None, str | None]):
+    # Same cheap bound as the tier cache: only recent logins are kept
+    if len(_recent_syncs) >= settings.user_sync_cache_size:
+        now = time.monotonic()
+        for key in [k for k, v in _recent_syncs.items() if v[2] <= now]:
+            del _recent_syncs[key]
+        if len(_recent_syncs) >= settings.user_sync_cache_size:
+            _recent_syncs.clear()
+    _recent_syncs[email] = (user_id, profile, time.monotonic() + settings.user_sync_cache_ttl)
 
 
 @router.post("/sync")
@@ -53,34 +59,52 @@ async def sync_user(
     Sync user from NextAuth on login.
     Creates user if not exists, returns current tier.
     Protected by internal API secret - not accessible from public internet.
-    """
-    result = await db.execute(
-        select(User).where(User.email == payload.email)
-    )
-    user = result.scalar_one_or_none()
 
-    if user:
-        user.name = payload.name or user.name
-        user.image = payload.image or user.image
-        await db.flush()
-        return {"id": user.id, "tier": user.tier, "synced": True}
+    One INSERT ... ON CONFLICT (email) DO UPDATE round trip, so concurrent
+    first logins can't race into a unique violation. Repeat logins with an
+    unchanged name/image within USER_SYNC_CACHE_TTL skip the write.
+    """
+    profile = (payload.name, payload.image)
+    cached = _recent_syncs.get(payload.email)
+    if cached and cached[1] == profile and cached[2] > time.monotonic():
+        tier = await tier_resolver.resolve(cached[0])
+        return {"id": cached[0], "tier": tier, "synced": True}
 
-    user = User(
+    stmt = insert(User).values(
         id=payload.id,
         email=payload.email,
         name=payload.name,
         image=payload.image,
         tier="ghost",
     )
-    db.add(user)
-    await db.flush()
-    return {"id": user.id, "tier": "ghost", "synced": True, "created": True}
+    # Empty or missing values keep what is stored, as before
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.email],
+        set_={
+            "name": func.coalesce(func.nullif(stmt.excluded.name, ""), User.name),
+            "image": func.coalesce(func.nullif(stmt.excluded.image, ""), User.image),
+            "updated_at": func.now(),
+        },
+    ).returning(
+        User.id,
+        User.tier,
+        # xmax is 0 only on a freshly inserted row version
+        literal_column("xmax = 0").label("created"),
+    )
+    row = (await db.execute(stmt)).one()
+    await db.commit()
+
+    _remember_sync(payload.email, row.id, profile)
+    result = {"id": row.id, "tier": row.tier, "synced": True}
+    if row.created:
+        result["created"] = True
+    return result
 
 
 @router.get("/me", response_model=UserProfile)
 async def get_profile(
     user: dict = Depends(require_auth),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get current user profile."""
     db_user = await db.get(User, user["id"])
@@ -121,11 +145,13 @@ async def create_portal(
     db_user = await db.get(User, user["id"])
     if not db_user or not db_user.stripe_customer_id:
         raise HTTPException(status_code=400, detail="No active subscription")
+    # Don't hold a pooled connection across the Stripe call
+    await release(db)
 
     base_url = settings.cors_origins[0] if settings.cors_origins else 'https://deadinternet.report'
 
-    session = stripe.billing_portal.Session.create(
-        customer=db_user.stripe_customer_id,
+    url = await stripe_service.create_portal_session(
+        customer_id=db_user.stripe_customer_id,
         return_url=f"{base_url}/dashboard",
     )
-    return {"portal_url": session.url}
+    return {"portal_url": url}
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.services.stripe_service import stripe_service
+from app.services.webhook_inbox import webhook_inbox
 
 router = APIRouter()
 
@@ -20,7 +21,8 @@ async def stripe_webhook(
 ):
     """
     Stripe webhook receiver.
-    Verifies signature and processes subscription events.
+    Verifies the signature and stores the event; processing happens in the
+    background (see WebhookInbox), so Stripe gets its 200 right away.
     """
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
@@ -29,9 +31,12 @@ async def stripe_webhook(
         raise HTTPException(status_code=400, detail="Missing stripe-signature header")
 
     try:
-        result = await stripe_service.handle_webhook_event(payload, sig_header, db)
-        return result
+        event = stripe_service.verify_event(payload, sig_header)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid payload")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    # A DB failure here is a 500, which makes Stripe redeliver
+    created = await webhook_inbox.store(event, payload, db)
+    return {"event": event.type, "received": True, "duplicate": not created}
@@ -0,0 +1,81 @@
+"""
+Operational commands, run inside the backend container.
+
+    python -m app.cli migrate        -> Apply Alembic migrations and create
+                                        upcoming scan partitions (run before
+                                        starting the server)
+    python -m app.cli partitions     -> Create upcoming scan partitions and
+                                        archive the ones past retention
+    python -m app.cli revoke-token   -> Revoke a JWT (read from stdin) until
+                                        it expires
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.database import engine, dispose_engines
+
+
+async def _migrate():
+    from alembic import command
+    from alembic.config import Config
+
+    from app.services.partition_service import partition_service
+
+    # alembic's env.py runs its own event loop, so keep it off this one
+    await asyncio.to_thread(command.upgrade, Config("alembic.ini"), "head")
+    async with engine.begin() as conn:
+        created = await partition_service.ensure_partitions(conn)
+    print(f"created: {', '.join(created) or '-'}")
+
+
+async def _partitions():
+    from app.services.partition_service import partition_service
+
+    async with engine.begin() as conn:
+        created = await partition_service.ensure_partitions(conn)
+    archived = await partition_service.archive_expired()
+    print(f"created: {', '.join(created) or '-'}")
+    print(f"archived: {', '.join(archived) or '-'}")
+
+
+async def _revoke_token():
+    from app.core.redis import redis_client
+    from app.core.security import revoked_tokens
+
+    token = sys.stdin.readline().strip()
+    await redis_client.connect()
+    try:
+        await revoked_tokens.revoke(token)
+    finally:
+        await redis_client.close()
+    print("revoked")
+
+
+COMMANDS = {
+    "migrate": _migrate,
+    "partitions": _partitions,
+    "revoke-token": _revoke_token,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+
+    async def run():
+        try:
+            await COMMANDS[args.command]()
+        finally:
+            await dispose_engines()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
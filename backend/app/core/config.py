@@ -3,7 +3,7 @@ Application settings loaded from environment variables.
 All config is centralized here - no magic strings elsewhere.
 
 CRITICAL: jwt_secret and internal_api_secret MUST be set via env vars.
-The app will refuse to start with insecure defaults.
+The app will refuse to start with insecure defaults (validate_settings).
 """
 
 import sys
@@ -19,14 +19,36 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "postgresql+asyncpg://deadinet:deadinet@db:5432/deadinternet"
+    database_replica_url: str = ""  # Read-only replica; empty = reads use the primary
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800  # Seconds; -1 disables
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection
+    db_pgbouncer: bool = False  # PgBouncer in transaction mode: no statement caches, unique statement names
 
     # Redis
     redis_url: str = "redis://redis:6379/0"
+    redis_max_connections: int = 50  # Per worker; callers wait up to redis_pool_timeout
+    redis_pool_timeout: float = 2.0
+    redis_socket_timeout: float = 1.0
+    redis_connect_timeout: float = 1.0
+    redis_health_check_interval: int = 30  # PING idle connections before reuse
+    redis_retry_attempts: int = 2
+    redis_retry_backoff_base: float = 0.02
+    redis_retry_backoff_cap: float = 0.25
+    redis_down_seconds: float = 5.0  # Skip Redis this long after a failure, then probe again
+    redis_degraded_limit_fraction: float = 0.25  # Share of the daily scan limit each worker allows while Redis is down
+    cache_serializer: str = "orjson"  # json | orjson | msgpack; readers accept all of them
+    cache_compress_min_bytes: int = 1024  # zstd-compress larger values; 0 disables
 
     # Auth - MUST match NEXTAUTH_SECRET from frontend
     # NO DEFAULT - must be set via environment variable
     jwt_secret: str = ""
     jwt_algorithm: str = "HS256"
+    jwt_cache_size: int = 10000  # Verified tokens kept per worker
+    jwt_revocation_refresh_seconds: float = 5.0
 
     # Internal API secret for server-to-server calls (NextAuth -> FastAPI)
     # NO DEFAULT - must be set via environment variable
@@ -45,20 +67,92 @@ class Settings(BaseSettings):
     # Anthropic
     anthropic_api_key: str = ""
     scanner_model: str = "claude-sonnet-4-5-20250929"
+    scan_coalesce_enabled: bool = True  # Share one analysis between concurrent scans of a URL
+    scan_coalesce_ttl: int = 60  # Cross-worker lock lifetime / max wait for a shared result
+    scan_coalesce_result_ttl: int = 30
+
+    # Tracing (OpenTelemetry, optional)
+    otel_enabled: bool = False
+    otel_service_name: str = "deadinternet-api"
+    otel_exporter: str = "otlp"  # otlp | file | console
+    otel_endpoint: str = "http://localhost:4318"  # OTLP/HTTP collector
+    otel_file_path: str = "/tmp/traces.jsonl"
+    otel_sample_ratio: float = 1.0
+
+    # Startup: pooled DB/Redis connections each worker opens before serving
+    prewarm_connections: int = 5
+    ready_db_timeout: float = 1.0  # /ready reports not ready if SELECT 1 takes longer
+
+    # Event loop lag monitor
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval: float = 0.1  # Seconds between lag samples
+    loop_lag_threshold: float = 0.25  # Log the blocking stack past this many seconds
+
+    # Request profiling (pyinstrument, optional)
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # Fraction of requests profiled at random
+    profiling_header: str = "X-Profile"  # Value must be the internal API secret
+    profiling_dir: str = "/tmp/profiles"
+    profiling_keep: int = 200
 
     # Stripe
     stripe_secret_key: str = ""
     stripe_webhook_secret: str = ""
     stripe_price_hunter: str = ""
     stripe_price_operator: str = ""
+    stripe_api_base: str = ""  # e.g. http://localhost:12111 for stripe-mock
+    stripe_timeout: float = 10.0
+    stripe_max_retries: int = 2
+
+    # Webhook inbox processing
+    webhook_poll_interval: float = 1.0
+    webhook_batch_size: int = 20
+    webhook_max_attempts: int = 8
+    webhook_retry_base_seconds: int = 5
+    webhook_retry_max_seconds: int = 3600
+    webhook_lease_seconds: int = 120  # How long a claimed event is hidden from other workers
 
     # Rate limits (scans per day)
     scan_rate_free: int = 0
     scan_rate_hunter: int = 10
     scan_rate_operator: int = 1000
 
+    # Token budgets (model tokens per user per UTC day, all kinds; 0 = no budget)
+    token_budget_free: int = 0
+    token_budget_hunter: int = 50_000
+    token_budget_operator: int = 2_000_000
+
+    # Token ledger: Redis counters flushed to token_usage
+    usage_flush_interval: float = 30.0
+    usage_flush_batch_size: int = 500
+    # USD per million tokens: input, output, cache write, cache read
+    model_prices: dict[str, list[float]] = {
+        "claude-sonnet-4-5-20250929": [3.0, 15.0, 3.75, 0.30],
+        "claude-sonnet-4-20250514": [3.0, 15.0, 3.75, 0.30],
+        "claude-haiku-4-5-20251001": [1.0, 5.0, 1.25, 0.10],
+    }
+
+    # Scan history partitions
+    scan_retention_months: int = 12  # Older monthly partitions get archived
+    scan_partitions_ahead: int = 3  # Future months created in advance
+    scan_archive_dir: str = "/data/archive"
+
+    # Write-behind buffer for scan inserts (off = one transaction per scan)
+    scan_write_buffer_enabled: bool = False
+    scan_write_batch_size: int = 200
+    scan_write_flush_ms: int = 250
+    scan_write_max_buffered: int = 10000  # Beyond this, writes go straight to the DB
+    scan_write_retry_max_seconds: float = 30.0  # Backoff cap while the DB is unreachable
+
     # Cache TTL (seconds)
     stats_cache_ttl: int = 3600  # 1 hour
+    tier_cache_local_ttl: float = 5.0  # Max staleness of a tier change per worker
+    tier_cache_redis_ttl: int = 300
+    tier_cache_local_size: int = 10000
+
+    # /users/sync: skip the upsert for repeat logins with an unchanged profile
+    user_sync_cache_ttl: float = 60.0
+    user_sync_cache_size: int = 10000
 
     class Config:
         env_file = ".env"
@@ -68,16 +162,21 @@ class Settings(BaseSettings):
 settings = Settings()
 
 # ── Startup validation ──────────────────────────────────────────────
+# Called from the app lifespan rather than at import, so tooling that
+# only needs settings (alembic, the CLI) doesn't require secrets.
 _INSECURE_SECRETS = {"", "change-me", "secret", "test", "dev"}
 
-if settings.jwt_secret.lower() in _INSECURE_SECRETS:
-    print("\n❌ FATAL: JWT_SECRET is not set or uses an insecure default.")
-    print("   Set a strong random value in your .env file:")
-    print("   JWT_SECRET=$(openssl rand -hex 32)")
-    sys.exit(1)
-
-if settings.internal_api_secret.lower() in _INSECURE_SECRETS:
-    print("\n❌ FATAL: INTERNAL_API_SECRET is not set or uses an insecure default.")
-    print("   Set a strong random value in your .env file:")
-    print("   INTERNAL_API_SECRET=$(openssl rand -hex 32)")
-    sys.exit(1)
+
+def validate_settings():
+    """Exit if required secrets are missing or use insecure defaults."""
+    if settings.jwt_secret.lower() in _INSECURE_SECRETS:
+        print("\n❌ FATAL: JWT_SECRET is not set or uses an insecure default.")
+        print("   Set a strong random value in your .env file:")
+        print("   JWT_SECRET=$(openssl rand -hex 32)")
+        sys.exit(1)
+
+    if settings.internal_api_secret.lower() in _INSECURE_SECRETS:
+        print("\n❌ FATAL: INTERNAL_API_SECRET is not set or uses an insecure default.")
+        print("   Set a strong random value in your .env file:")
+        print("   INTERNAL_API_SECRET=$(openssl rand -hex 32)")
+        sys.exit(1)
@@ -1,27 +1,67 @@
 """
 Async SQLAlchemy setup with PostgreSQL.
 Uses asyncpg driver for non-blocking DB operations.
+
+Two engines:
+  - engine: the primary, for everything that writes
+  - read_engine: DATABASE_REPLICA_URL if set, else the primary engine.
+    Read-only endpoints take get_read_db() and may lag the primary by
+    the replica's replay delay.
 """
 
+from uuid import uuid4
+
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
 
-# Async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_size=20,
-    max_overflow=10,
+
+def _connect_args() -> dict:
+    if not settings.db_pgbouncer:
+        return {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    # PgBouncer hands each transaction a different server connection, so
+    # neither SQLAlchemy's nor asyncpg's cache may reuse a statement, and
+    # statement names must not collide with ones left on that connection
+    return {
+        "prepared_statement_cache_size": 0,
+        "statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        echo=settings.debug,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(),
+    )
+
+
+# Async engines
+engine = _create_engine(settings.database_url)
+read_engine = (
+    _create_engine(settings.database_replica_url)
+    if settings.database_replica_url
+    else engine
 )
 
-# Session factory
+# Session factories
 async_session = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
+read_session = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 
 class Base(DeclarativeBase):
@@ -30,13 +70,42 @@ class Base(DeclarativeBase):
 
 
 async def get_db() -> AsyncSession:
-    """Dependency: yields an async DB session."""
+    """
+    Dependency: yields an async DB session.
+    The session only checks out a pooled connection on its first query,
+    and only commits if a transaction was actually started.
+    """
     async with async_session() as session:
         try:
             yield session
-            await session.commit()
+            if session.in_transaction():
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """Dependency: yields a session on the read replica. Never commits."""
+    async with read_session() as session:
+        yield session
+
+
+async def release(session: AsyncSession):
+    """
+    End the session's transaction so its connection goes back to the pool.
+    Call before awaiting slow external work (Stripe, Anthropic) mid-request;
+    loaded objects stay usable and the next query checks out a fresh
+    connection.
+    """
+    if session.in_transaction():
+        await session.commit()
+
+
+async def dispose_engines():
+    """Close both connection pools."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
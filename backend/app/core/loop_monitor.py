@@ -0,0 +1,97 @@
+"""
+Event loop lag monitor.
+
+A background task sleeps LOOP_MONITOR_INTERVAL seconds at a time and
+records how late each wakeup is in event_loop_lag_seconds; any lateness
+is time the loop spent running something else without yielding.
+
+Lag measured after the fact can't say what blocked, so a watchdog
+thread also checks the task's heartbeat. If the loop hasn't come back
+for LOOP_LAG_THRESHOLD seconds, the watchdog grabs the loop thread's
+current stack (the code that is blocking, e.g. a sync getaddrinfo) and
+logs it once per stall, along with the running task.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from contextlib import suppress
+
+from app.core.config import settings
+from app.core.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """Measures event loop lag and reports what blocked it."""
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat = 0.0
+
+    async def start(self):
+        if not settings.loop_monitor_enabled or self._task:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        await asyncio.to_thread(self._watchdog.join, 1.0)
+        self._watchdog = None
+
+    async def _run(self):
+        interval = settings.loop_monitor_interval
+        while True:
+            scheduled = time.monotonic()
+            await asyncio.sleep(interval)
+            self._heartbeat = now = time.monotonic()
+            EVENT_LOOP_LAG.observe(max(0.0, now - scheduled - interval))
+
+    def _watch(self):
+        """Runs in a thread: the loop can't report on itself while it is blocked."""
+        threshold = settings.loop_lag_threshold
+        interval = settings.loop_monitor_interval
+        reported = 0.0  # Heartbeat of the stall already logged
+        while not self._stopping.wait(interval):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - interval
+            if stalled < threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+            EVENT_LOOP_BLOCKS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>"
+            task = self._current_task()
+            logger.warning(
+                f"Event loop blocked for {stalled:.3f}s+ in task {task}:\n{stack}"
+            )
+
+    def _current_task(self) -> str:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return "<unknown>"
+        return task.get_name() if task else "<none>"
+
+
+loop_monitor = LoopMonitor()
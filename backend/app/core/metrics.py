@@ -0,0 +1,142 @@
+"""
+Prometheus metrics.
+
+Exposed at GET /metrics on the backend port. nginx doesn't route it,
+so it is only reachable from inside the Docker network.
+
+    scan_stage_seconds{stage}         Histogram per scan pipeline stage:
+                                      validation, fetch, extraction,
+                                      sanitize, model, parse, db_write
+    scan_tokens_total{model,kind}     Claude input/output/cache_read/cache_write tokens
+    scan_parse_failures_total         Model replies that weren't valid JSON
+    cache_requests_total{cache,result} Hits/misses per cache layer
+    rate_limit_rejections_total{tier} Scans refused with 429
+    token_budget_rejections_total{tier} Scans refused by the daily token budget
+    scan_cost_usd_total{model}        Estimated Claude spend (see UsageLedger)
+    event_loop_lag_seconds            Scheduling delay of the loop monitor's timer
+    event_loop_blocks_total           Stalls longer than LOOP_LAG_THRESHOLD
+    db_pool_connections{engine,state} Checked out / idle / overflow, read at scrape
+    redis_pool_connections{state}     In use / available, read at scrape
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR so counters and histograms
+are aggregated across workers. Pool gauges always describe the worker
+that served the scrape.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import REGISTRY, Collector
+
+# Stages range from sub-millisecond regexes to multi-second model calls
+_STAGE_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0,
+)
+
+SCAN_STAGE_SECONDS = Histogram(
+    "scan_stage_seconds",
+    "Time spent in each stage of a URL scan",
+    ["stage"],
+    buckets=_STAGE_BUCKETS,
+)
+SCAN_TOKENS = Counter(
+    "scan_tokens",
+    "Claude tokens used by scans",
+    ["model", "kind"],
+)
+SCAN_PARSE_FAILURES = Counter(
+    "scan_parse_failures",
+    "Model responses that could not be parsed as JSON",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups by cache layer and result",
+    ["cache", "result"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections",
+    "Scans rejected by the daily rate limit",
+    ["tier"],
+)
+TOKEN_BUDGET_REJECTIONS = Counter(
+    "token_budget_rejections",
+    "Scans rejected because the user's daily token budget is spent",
+    ["tier"],
+)
+SCAN_COST = Counter(
+    "scan_cost_usd",
+    "Estimated model spend of scans, at MODEL_PRICES",
+    ["model"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer scheduled by the loop monitor",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks",
+    "Times the event loop was blocked for longer than the lag threshold",
+)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block into scan_stage_seconds{stage=name}."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SCAN_STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+
+class PoolCollector(Collector):
+    """Reads DB and Redis pool usage at scrape time."""
+
+    def collect(self):
+        # Imported here: the engines and client are created after this module
+        from app.core.database import engine, read_engine
+        from app.core.redis import redis_client
+
+        db = GaugeMetricFamily(
+            "db_pool_connections",
+            "SQLAlchemy pool connections by state",
+            labels=["engine", "state"],
+        )
+        engines = {"primary": engine}
+        if read_engine is not engine:
+            engines["replica"] = read_engine
+        for name, eng in engines.items():
+            pool = eng.pool
+            db.add_metric([name, "size"], pool.size())
+            db.add_metric([name, "checked_out"], pool.checkedout())
+            db.add_metric([name, "idle"], pool.checkedin())
+            db.add_metric([name, "overflow"], max(pool.overflow(), 0))
+        yield db
+
+        redis = GaugeMetricFamily(
+            "redis_pool_connections",
+            "Redis pool connections by state",
+            labels=["state"],
+        )
+        for state, value in redis_client.pool_stats().items():
+            redis.add_metric([state], value)
+        yield redis
+
+
+_pool_collector = PoolCollector()
+REGISTRY.register(_pool_collector)
+
+
+def render() -> bytes:
+    """Exposition text for /metrics, merged across workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(_pool_collector)
+    return generate_latest(registry)
@@ -0,0 +1,73 @@
+"""
+Keyset (cursor) pagination for scan listings.
+
+Pages are addressed by the (created_at, id) of the last row seen instead of
+an OFFSET, so every page is an index range scan on ix_scans_user_created_id
+and costs the same no matter how deep the user has paged.
+
+Cursors are opaque URL-safe strings; clients only echo them back.
+"""
+
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+
+from app.models.scan import Scan
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, scan_id: str) -> str:
+    """Build an opaque cursor pointing just after the given scan."""
+    raw = f"{created_at.isoformat()}|{scan_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Parse a cursor produced by encode_cursor(). Raises 400 if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, scan_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), scan_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def clamp_limit(limit: int) -> int:
+    """Keep page size within 1..MAX_PAGE_SIZE."""
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def newest_first(stmt: Select, after: tuple[datetime, str] | None = None) -> Select:
+    """Order a Scan query newest first, starting just after a decoded cursor."""
+    if after:
+        # Plain range on created_at lets Postgres prune newer partitions;
+        # the row comparison alone is opaque to the partition pruner.
+        stmt = stmt.where(
+            Scan.created_at <= after[0],
+            tuple_(Scan.created_at, Scan.id) < after,
+        )
+    return stmt.order_by(Scan.created_at.desc(), Scan.id.desc())
+
+
+def paginate_scans(stmt: Select, cursor: str | None, limit: int) -> Select:
+    """
+    Apply keyset filter, newest-first ordering and limit to a Scan query.
+    Fetches one extra row so split_page() can tell whether a next page exists.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    return newest_first(stmt, after).limit(limit + 1)
+
+
+def split_page(rows: list[Scan], limit: int) -> tuple[list[Scan], str | None]:
+    """Trim the lookahead row and return (page, next_cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,119 @@
+"""
+Opt-in request profiling with pyinstrument.
+
+Only installed when PROFILING_ENABLED=true; otherwise the middleware is
+never added and requests pay nothing. When installed, a request is
+profiled if either:
+  - a random draw falls under PROFILING_SAMPLE_RATE, or
+  - it carries PROFILING_HEADER set to the internal API secret.
+
+pyinstrument samples wall-clock time in async mode, so time spent
+blocking the event loop (sync DNS, sync SDK calls) shows up attributed
+to the request that caused it. Each profile is written as HTML to
+PROFILING_DIR, named after the time, method, route and duration; only
+the newest PROFILING_KEEP files are kept. List and download them via
+/api/v1/admin/profiles.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import secrets
+import time
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.html$")
+
+
+def profile_dir() -> Path:
+    return Path(settings.profiling_dir)
+
+
+def list_profiles() -> list[dict]:
+    """Saved profiles, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    entries = [
+        (path, path.stat())
+        for path in directory.iterdir()
+        if PROFILE_NAME.match(path.name)
+    ]
+    entries.sort(key=lambda e: e[1].st_mtime, reverse=True)
+    return [
+        {"name": path.name, "bytes": stat.st_size, "created_at": stat.st_mtime}
+        for path, stat in entries
+    ]
+
+
+def profile_path(name: str) -> Path | None:
+    """Path of a saved profile, or None if the name is invalid or missing."""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+
+def _save(html: str, name: str):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f".{name}.tmp"
+    tmp.write_text(html)
+    os.replace(tmp, directory / name)
+
+    profiles = sorted(
+        (p for p in directory.iterdir() if PROFILE_NAME.match(p.name)),
+        key=lambda p: p.stat().st_mtime,
+    )
+    for old in profiles[:-settings.profiling_keep]:
+        old.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles sampled or explicitly requested requests."""
+
+    def __init__(self, app):
+        from pyinstrument import Profiler  # Only needed when profiling is on
+
+        self.app = app
+        self._profiler_class = Profiler
+        self._header = settings.profiling_header.lower().encode()
+
+    def _wanted(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self._header:
+                return secrets.compare_digest(value, settings.internal_api_secret.encode())
+        return random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = self._profiler_class(async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            slug = re.sub(r"[^\w-]+", "_", route).strip("_") or "root"
+            name = (
+                f"{time.strftime('%Y%m%dT%H%M%S')}_{secrets.token_hex(2)}_"
+                f"{scope['method']}_{slug}_{duration_ms}ms.html"
+            )
+            try:
+                html = profiler.output_html()
+                await asyncio.to_thread(_save, html, name)
+            except Exception:
+                logger.exception(f"Could not save profile {name}")
+            else:
+                logger.info(f"Saved profile {name}")
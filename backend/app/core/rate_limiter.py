@@ -1,13 +1,25 @@
 """
 Redis-based rate limiter for the URL scanner.
 Limits are per-user, per-day, based on subscription tier.
+
+If Redis is down, scans are counted in-process instead and each worker
+allows only REDIS_DEGRADED_LIMIT_FRACTION of the daily limit, since the
+workers can't see each other's counts. Those local counts are added to
+the Redis counters once Redis is back.
 """
 
+import logging
+from collections import Counter
+from datetime import date, datetime, timezone
+
 from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_REJECTIONS
 from app.core.redis import redis_client
 
+logger = logging.getLogger(__name__)
+
 
 TIER_LIMITS = {
     "ghost": settings.scan_rate_free,
@@ -15,6 +27,35 @@ TIER_LIMITS = {
     "operator": settings.scan_rate_operator,
 }
 
+# (user_id, UTC day) -> scans counted while Redis was unavailable
+_local_counts: Counter[tuple[str, date]] = Counter()
+
+
+def _usage_key(user_id: str) -> str:
+    return f"scan_count:{user_id}"
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _degraded_limit(limit: int) -> int:
+    return max(1, int(limit * settings.redis_degraded_limit_fraction))
+
+
+async def _count_scan(user_id: str, limit: int) -> tuple[int, int]:
+    """Count one scan. Returns (used, effective limit)."""
+    key = (user_id, _today())
+    if redis_client.available:
+        try:
+            used = await redis_client.increment_daily(_usage_key(user_id))
+            # Outage scans not yet reconciled into Redis still count
+            return used + _local_counts.get(key, 0), limit
+        except Exception as e:
+            logger.warning(f"Scan counter unavailable, counting locally: {e}")
+    _local_counts[key] += 1
+    return _local_counts[key], _degraded_limit(limit)
+
 
 async def check_scan_limit(user_id: str, tier: str) -> dict:
     """
@@ -30,10 +71,10 @@ async def check_scan_limit(user_id: str, tier: str) -> dict:
             detail="Scanner requires Hunter or Operator tier",
         )
 
-    key = f"scan_count:{user_id}"
-    current = await redis_client.increment_daily(key)
+    current, limit = await _count_scan(user_id, limit)
 
     if current > limit:
+        RATE_LIMIT_REJECTIONS.labels(tier).inc()
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=f"Daily scan limit reached ({limit}/day for {tier} tier)",
@@ -45,3 +86,43 @@ async def check_scan_limit(user_id: str, tier: str) -> dict:
         "limit": limit,
         "remaining": limit - current,
     }
+
+
+async def get_scan_usage(user_id: str, tier: str) -> dict:
+    """Today's usage without counting a scan."""
+    limit = TIER_LIMITS.get(tier, 0)
+    local = _local_counts.get((user_id, _today()), 0)
+    if redis_client.available:
+        try:
+            current = await redis_client.get_cached(_usage_key(user_id))
+            used = (int(current) if current else 0) + local
+            return {"used": used, "limit": limit, "remaining": max(0, limit - used)}
+        except Exception as e:
+            logger.warning(f"Scan counter unavailable, reporting local usage: {e}")
+    limit = _degraded_limit(limit)
+    return {"used": local, "limit": limit, "remaining": max(0, limit - local)}
+
+
+async def reconcile_local_counts():
+    """
+    Fold scans counted during an outage into today's Redis counters.
+    Each local count is removed only after Redis has it, so usage and
+    limit checks never see a scan missing from both.
+    """
+    today = _today()
+    for (user_id, day), count in list(_local_counts.items()):
+        # Yesterday's counters have already expired in Redis
+        if day != today:
+            del _local_counts[(user_id, day)]
+            continue
+        try:
+            await redis_client.increment_daily(_usage_key(user_id), count)
+        except Exception as e:
+            logger.warning(f"Could not reconcile {count} scans for {user_id}: {e}")
+            continue
+        _local_counts[(user_id, day)] -= count
+        if _local_counts[(user_id, day)] <= 0:
+            del _local_counts[(user_id, day)]
+
+
+redis_client.on_recovery(reconcile_local_counts)
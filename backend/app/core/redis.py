@@ -1,10 +1,39 @@
 """
 Redis client for caching and rate limiting.
 Wraps redis-py async client with helper methods.
+
+Connections come from a bounded blocking pool (REDIS_MAX_CONNECTIONS)
+with socket timeouts, periodic health checks on idle connections, and
+retry with jittered exponential backoff on connection errors and
+timeouts. Replies are parsed by hiredis when it is installed.
+
+Counter writes (INCRBY/HINCRBY) must not be retried: if the connection
+drops after Redis applied the command, a retry counts it twice. They go
+through pipeline(retry=False), which uses a separate pool whose
+connections never retry. Reads and idempotent writes keep retrying.
+
+Health tracking: callers report failures with mark_failed(). For the next
+REDIS_DOWN_SECONDS `available` is False and callers use their local
+fallbacks without waiting on timeouts; after that the next call probes
+Redis again. The first success after an outage runs the callbacks
+registered with on_recovery() to push local state back.
 """
 
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
 import redis.asyncio as aioredis
+from redis.asyncio.retry import Retry
+from redis.backoff import EqualJitterBackoff, NoBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+
 from app.core.config import settings
+from app.core.serializers import Codec
+
+logger = logging.getLogger(__name__)
 
 
 class RedisClient:
@@ -12,16 +41,58 @@ class RedisClient:
 
     def __init__(self):
         self._client: aioredis.Redis | None = None
+        self._binary: aioredis.Redis | None = None
+        self._counters: aioredis.Redis | None = None
+        self.codec = Codec(settings.cache_serializer, settings.cache_compress_min_bytes)
+        self._down_since: float | None = None
+        self._retry_at = 0.0
+        self._recovery_callbacks: list[Callable[[], Awaitable[None]]] = []
+        self._recovery_task: asyncio.Task | None = None
 
     async def connect(self):
-        self._client = aioredis.from_url(
+        pool = aioredis.BlockingConnectionPool.from_url(
             settings.redis_url,
             decode_responses=True,
+            max_connections=settings.redis_max_connections,
+            timeout=settings.redis_pool_timeout,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_connect_timeout,
+            socket_keepalive=True,
+            health_check_interval=settings.redis_health_check_interval,
+            retry=Retry(
+                EqualJitterBackoff(
+                    cap=settings.redis_retry_backoff_cap,
+                    base=settings.redis_retry_backoff_base,
+                ),
+                settings.redis_retry_attempts,
+            ),
+            retry_on_error=[ConnectionError, TimeoutError],
+        )
+        self._client = aioredis.Redis(connection_pool=pool)
+        # Same settings without response decoding, for serialized objects
+        self._binary = aioredis.Redis(
+            connection_pool=aioredis.BlockingConnectionPool(
+                # from_url keeps the class (e.g. SSLConnection for rediss://) off the kwargs
+                connection_class=pool.connection_class,
+                **{**pool.connection_kwargs, "decode_responses": False},
+                max_connections=settings.redis_max_connections,
+                timeout=settings.redis_pool_timeout,
+            )
+        )
+        # Same settings without retries, for non-idempotent counter writes
+        self._counters = aioredis.Redis(
+            connection_pool=aioredis.BlockingConnectionPool(
+                connection_class=pool.connection_class,
+                **{**pool.connection_kwargs, "retry": Retry(NoBackoff(), 0)},
+                max_connections=settings.redis_max_connections,
+                timeout=settings.redis_pool_timeout,
+            )
         )
 
     async def close(self):
-        if self._client:
-            await self._client.close()
+        for client in (self._client, self._binary, self._counters):
+            if client:
+                await client.aclose()
 
     @property
     def client(self) -> aioredis.Redis:
@@ -29,21 +100,122 @@ class RedisClient:
             raise RuntimeError("Redis not connected. Call connect() first.")
         return self._client
 
+    def pool_stats(self) -> dict[str, int]:
+        """Connection counts of the main pool, for metrics."""
+        if not self._client:
+            return {}
+        pool = self._client.connection_pool
+        return {
+            "max": pool.max_connections,
+            "in_use": len(pool._in_use_connections),
+            "available": len(pool._available_connections),
+        }
+
+    @property
+    def available(self) -> bool:
+        """False while Redis is considered down; True again once a probe is due."""
+        return self._down_since is None or time.monotonic() >= self._retry_at
+
+    @property
+    def degraded(self) -> bool:
+        return self._down_since is not None
+
+    def mark_failed(self, error: Exception):
+        now = time.monotonic()
+        if self._down_since is None:
+            self._down_since = now
+            logger.error(f"Redis unavailable, switching to degraded mode: {error}")
+        self._retry_at = now + settings.redis_down_seconds
+
+    def mark_ok(self):
+        if self._down_since is None:
+            return
+        logger.warning(f"Redis back after {time.monotonic() - self._down_since:.1f}s, reconciling local state")
+        self._down_since = None
+        if self._recovery_callbacks and not self._recovery_task:
+            self._recovery_task = asyncio.create_task(self._recover())
+
+    def on_recovery(self, callback: Callable[[], Awaitable[None]]):
+        """Register a coroutine function to run when Redis comes back."""
+        self._recovery_callbacks.append(callback)
+
+    async def _recover(self):
+        try:
+            for callback in self._recovery_callbacks:
+                try:
+                    await callback()
+                except Exception:
+                    logger.exception(f"Redis recovery callback {callback.__qualname__} failed")
+        finally:
+            self._recovery_task = None
+
+    async def tracked(self, awaitable: Awaitable):
+        """Await a Redis call, recording whether Redis is reachable."""
+        try:
+            result = await awaitable
+        except (ConnectionError, TimeoutError) as e:
+            self.mark_failed(e)
+            raise
+        self.mark_ok()
+        return result
+
+    def pipeline(self, transaction: bool = False, retry: bool = True):
+        """
+        Batch several commands into one round trip:
+
+            async with redis_client.pipeline() as pipe:
+                pipe.get(a).incr(b)
+                value, count = await pipe.execute()
+
+        Pass retry=False when the batch increments counters, so a dropped
+        connection fails the call instead of replaying it.
+        """
+        if retry:
+            return self.client.pipeline(transaction=transaction)
+        if not self._counters:
+            raise RuntimeError("Redis not connected. Call connect() first.")
+        return self._counters.pipeline(transaction=transaction)
+
     async def get_cached(self, key: str) -> str | None:
         """Get value from cache."""
-        return await self.client.get(key)
+        return await self.tracked(self.client.get(key))
+
+    async def get_object(self, key: str):
+        """Get a value stored with set_object(), or None."""
+        if not self._binary:
+            raise RuntimeError("Redis not connected. Call connect() first.")
+        data = await self.tracked(self._binary.get(key))
+        return None if data is None else self.codec.decode(data)
+
+    async def set_object(self, key: str, value, ttl: int = 3600):
+        """Serialize value with the configured codec and set it with TTL."""
+        if not self._binary:
+            raise RuntimeError("Redis not connected. Call connect() first.")
+        await self.tracked(self._binary.setex(key, ttl, self.codec.encode(value)))
+
+    async def get_many(self, *keys: str) -> list[str | None]:
+        """Get several values in one round trip (None for missing keys)."""
+        if not keys:
+            return []
+        return await self.tracked(self.client.mget(keys))
 
     async def set_cached(self, key: str, value: str, ttl: int = 3600):
         """Set value with TTL."""
-        await self.client.setex(key, ttl, value)
-
-    async def increment_daily(self, key: str) -> int:
-        """Increment a daily counter. Expires at midnight UTC."""
-        pipe = self.client.pipeline()
-        pipe.incr(key)
-        pipe.expire(key, 86400)  # 24h
-        results = await pipe.execute()
+        await self.tracked(self.client.setex(key, ttl, value))
+
+    async def increment_daily(self, key: str, amount: int = 1) -> int:
+        """Increment a daily counter. Expires at midnight UTC. Never retried."""
+        now = datetime.now(timezone.utc)
+        midnight = datetime(now.year, now.month, now.day, tzinfo=timezone.utc) + timedelta(days=1)
+        async with self.pipeline(transaction=True, retry=False) as pipe:
+            pipe.incrby(key, amount)
+            # Absolute expiry, so later increments don't push the reset back
+            pipe.expireat(key, midnight)
+            results = await self.tracked(pipe.execute())
         return results[0]
 
+    async def ping(self) -> bool:
+        return await self.tracked(self.client.ping())
+
 
 redis_client = RedisClient()
@@ -0,0 +1,38 @@
+"""
+JSON response serialization.
+
+ORJSONResponse is the app-wide default (see main.py), which replaces the
+stdlib json encoder. FastAPI still walks every returned value through
+jsonable_encoder, or re-validates it against response_model, before
+encoding. The hot endpoints skip that step:
+  - Schema-backed responses (scan results and pages) are validated once
+    from ORM rows with a prebuilt TypeAdapter and dumped straight to
+    bytes by pydantic-core (typed_response)
+  - Schemaless dicts (stats) go straight to orjson (raw_response)
+
+Endpoints returning these still declare response_model, so the OpenAPI
+docs are unchanged; FastAPI passes Response objects through untouched.
+"""
+
+from typing import Any, TypeVar
+
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+def typed_response(adapter: TypeAdapter[T], data: Any, status_code: int = 200) -> Response:
+    """
+    Validate `data` (dicts and/or ORM objects) once against the adapter's
+    type and serialize it to JSON bytes.
+    """
+    value = adapter.validate_python(data, from_attributes=True)
+    return Response(
+        adapter.dump_json(value), status_code=status_code, media_type="application/json"
+    )
+
+
+def raw_response(content: Any, status_code: int = 200) -> ORJSONResponse:
+    """Encode plain JSON-compatible data with orjson, skipping jsonable_encoder."""
+    return ORJSONResponse(content, status_code=status_code)
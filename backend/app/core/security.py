@@ -2,16 +2,131 @@
 JWT validation for requests coming from NextAuth.js frontend.
 We don't issue tokens here - NextAuth handles that.
 We only verify them to protect API endpoints.
+
+Verified claims are cached per process, keyed by token hash, until the
+token expires. Revoked tokens are tracked in a Redis sorted set
+(member = token hash, score = exp) mirrored locally every few seconds.
 """
 
-from fastapi import Depends, HTTPException, status
+import hashlib
+import logging
+import secrets
+import time
+from collections import OrderedDict
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 
 from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.core.redis import redis_client
+from app.core.tiers import tier_resolver
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
 
+REVOKED_TOKENS_KEY = "auth:revoked"
+
+
+def token_hash(token: str) -> str:
+    """Cache/revocation key for a raw token; the token itself is never stored."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of decoded user claims, each valid until its token's exp."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        user, exp = entry
+        if exp <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user
+
+    def put(self, key: str, user: dict, exp: float):
+        self._entries[key] = (user, exp)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class RevocationList:
+    """Local mirror of revoked token hashes, refreshed from Redis."""
+
+    def __init__(self):
+        self._hashes: frozenset[str] = frozenset()
+        self._loaded_at = float("-inf")
+
+    async def contains(self, key: str) -> bool:
+        if time.monotonic() - self._loaded_at >= settings.jwt_revocation_refresh_seconds:
+            await self._refresh()
+        return key in self._hashes
+
+    async def _refresh(self):
+        # Stamp first so concurrent requests don't all hit Redis at once
+        self._loaded_at = time.monotonic()
+        if not redis_client.available:
+            return
+        try:
+            members = await redis_client.client.zrangebyscore(
+                REVOKED_TOKENS_KEY, time.time(), "+inf"
+            )
+        except Exception as e:
+            # Keep the last known list rather than failing every request
+            logger.warning(f"Could not refresh token revocation list: {e}")
+            return
+        self._hashes = frozenset(members)
+
+    async def revoke(self, token: str) -> None:
+        """Revoke a token until it expires. Raises 401 if it's not a valid token."""
+        payload = _decode(token)
+        key = token_hash(token)
+        pipe = redis_client.client.pipeline()
+        pipe.zadd(REVOKED_TOKENS_KEY, {key: payload["exp"]})
+        pipe.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", time.time())
+        await pipe.execute()
+        self._hashes = self._hashes | {key}
+        token_cache.discard(key)
+
+
+token_cache = VerifiedTokenCache(settings.jwt_cache_size)
+revoked_tokens = RevocationList()
+
+
+def _decode(token: str) -> dict:
+    """Full signature and claims verification."""
+    try:
+        return jwt.decode(
+            token,
+            settings.jwt_secret,
+            algorithms=[settings.jwt_algorithm],
+            options={
+                "require_sub": True,
+                "require_exp": True,
+            },
+        )
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
@@ -23,17 +138,19 @@ async def get_current_user(
     if not credentials:
         return None
 
-    try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.jwt_secret,
-            algorithms=[settings.jwt_algorithm],
-            options={
-                "require_sub": True,
-                "require_exp": True,
-            },
+    token = credentials.credentials
+    key = token_hash(token)
+    if await revoked_tokens.contains(key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
         )
 
+    user = token_cache.get(key)
+    CACHE_REQUESTS.labels("jwt", "miss" if user is None else "hit").inc()
+    if user is None:
+        payload = _decode(token)
+
         sub = payload.get("sub")
         email = payload.get("email")
         if not sub or not email:
@@ -42,27 +159,30 @@ async def get_current_user(
                 detail="Malformed token: missing required claims",
             )
 
-        return {
+        user = {
             "id": sub,
             "email": email,
             "tier": payload.get("tier", "ghost"),
         }
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-        )
+        token_cache.put(key, user, float(payload["exp"]))
+
+    # Callers get their own copy; the cached claims stay pristine
+    return dict(user)
 
 
 async def require_auth(
     user: dict | None = Depends(get_current_user),
 ) -> dict:
-    """Dependency: requires authenticated user."""
+    """
+    Dependency: requires authenticated user.
+    The tier is resolved live, not taken from the (possibly stale) JWT claim.
+    """
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required",
         )
+    user["tier"] = await tier_resolver.resolve(user["id"], fallback=user["tier"])
     return user
 
 
@@ -81,3 +201,13 @@ def require_tier(min_tier: str):
         return user
 
     return check_tier
+
+
+async def verify_internal_secret(
+    x_internal_secret: str | None = Header(None, alias="X-Internal-Secret"),
+) -> None:
+    """Verify that the request comes from our NextAuth backend (or an operator)."""
+    if not x_internal_secret:
+        raise HTTPException(status_code=401, detail="Missing internal auth")
+    if not secrets.compare_digest(x_internal_secret, settings.internal_api_secret):
+        raise HTTPException(status_code=403, detail="Invalid internal auth")
@@ -0,0 +1,139 @@
+"""
+Cache serializers - compact binary encodings for values stored in Redis.
+
+Every encoded value starts with one header byte:
+
+    bits 0-6  format id (1 = json, 2 = orjson, 3 = msgpack)
+    bit 7     zstd-compressed body
+
+so readers decode any known format regardless of CACHE_SERIALIZER, and
+the setting can be changed with a rolling deploy. Values without a known
+header (plain JSON text written before this module existed) are read as
+JSON.
+
+orjson, msgpack and zstandard are imported lazily; a serializer whose
+package is missing falls back to stdlib json, and compression is skipped
+without zstandard.
+"""
+
+import json
+import logging
+from functools import cached_property
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED = 0x80
+
+
+class Serializer:
+    """stdlib json. Base class and fallback for the others."""
+
+    name = "json"
+    format_id = 1
+
+    def dumps(self, value) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+    format_id = 2
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, value) -> bytes:
+        return self._orjson.dumps(value)
+
+    def loads(self, data: bytes):
+        return self._orjson.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    name = "msgpack"
+    format_id = 3
+
+    def __init__(self):
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def dumps(self, value) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True, datetime=True)
+
+    def loads(self, data: bytes):
+        return self._msgpack.unpackb(data, raw=False, timestamp=3)
+
+
+SERIALIZER_CLASSES: dict[str, type[Serializer]] = {
+    cls.name: cls for cls in (Serializer, OrjsonSerializer, MsgpackSerializer)
+}
+
+
+class Codec:
+    """Encodes values with a chosen serializer and decodes any known format."""
+
+    def __init__(self, serializer: str = "orjson", compress_min_bytes: int = 0, level: int = 3):
+        self._by_id: dict[int, Serializer] = {}
+        self.serializer = self._load(serializer)
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+
+    def _load(self, name: str) -> Serializer:
+        cls = SERIALIZER_CLASSES.get(name)
+        if cls is None:
+            raise ValueError(f"Unknown cache serializer: {name}")
+        if cls.format_id in self._by_id:
+            return self._by_id[cls.format_id]
+        try:
+            serializer = cls()
+        except ImportError:
+            logger.warning(f"{name} is not installed, cache values use json")
+            serializer = Serializer()
+        self._by_id[cls.format_id] = serializer
+        return serializer
+
+    def _for_id(self, format_id: int) -> Serializer:
+        serializer = self._by_id.get(format_id)
+        if serializer is None:
+            cls = next((c for c in SERIALIZER_CLASSES.values() if c.format_id == format_id), None)
+            if cls is None:
+                raise ValueError(f"Unknown cache format id: {format_id}")
+            # Values written by another worker: decoding needs the real package
+            serializer = self._by_id[format_id] = cls()
+        return serializer
+
+    @cached_property
+    def _zstd(self):
+        """(compressor, decompressor), or None without zstandard."""
+        try:
+            import zstandard
+        except ImportError:
+            return None
+        return zstandard.ZstdCompressor(level=self.level), zstandard.ZstdDecompressor()
+
+    def encode(self, value) -> bytes:
+        body = self.serializer.dumps(value)
+        header = self.serializer.format_id
+        if self.compress_min_bytes and len(body) >= self.compress_min_bytes and self._zstd:
+            body = self._zstd[0].compress(body)
+            header |= COMPRESSED
+        return bytes((header,)) + body
+
+    def decode(self, data: bytes):
+        header = data[0]
+        format_id = header & ~COMPRESSED
+        if format_id not in {cls.format_id for cls in SERIALIZER_CLASSES.values()}:
+            # Legacy plain JSON text
+            return json.loads(data)
+        body = data[1:]
+        if header & COMPRESSED:
+            if not self._zstd:
+                raise ValueError("Cache value is zstd-compressed but zstandard is not installed")
+            body = self._zstd[1].decompress(body)
+        return self._for_id(format_id).loads(body)
@@ -0,0 +1,120 @@
+"""
+Live subscription tier lookup.
+
+The JWT `tier` claim is only as fresh as the user's last login, so
+authenticated requests resolve the tier from the users table instead,
+through two cache layers:
+  1. Per-process dict, TIER_CACHE_LOCAL_TTL seconds (no network)
+  2. Redis key tier:{user_id}, TIER_CACHE_REDIS_TTL seconds
+  3. Postgres users.tier on a miss in both
+
+WebhookInbox invalidates both layers after committing a tier change,
+so upgrades and cancellations apply within the local TTL on every worker.
+Invalidation also bumps tiergen:{user_id}. A resolve that read the old
+tier from Postgres before the change only caches it if the generation
+is still the one it saw before that read, so it cannot put the stale
+tier back after the invalidation.
+"""
+
+import logging
+import time
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.metrics import CACHE_REQUESTS
+from app.core.redis import redis_client
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Cache the tier only if no invalidation happened since ARGV[1] was read
+_SET_IF_GENERATION = """
+if (redis.call("get", KEYS[2]) or "") == ARGV[1] then
+    return redis.call("set", KEYS[1], ARGV[2], "EX", ARGV[3])
+end
+return 0
+"""
+
+
+class TierResolver:
+    """Resolves a user's current tier with a local + Redis cache."""
+
+    KEY_PREFIX = "tier:"
+    GENERATION_PREFIX = "tiergen:"
+
+    def __init__(self):
+        self._local: dict[str, tuple[str, float]] = {}
+
+    async def resolve(self, user_id: str, fallback: str = "ghost") -> str:
+        """Current tier for user_id; `fallback` if the user isn't in the DB."""
+        entry = self._local.get(user_id)
+        if entry and entry[1] > time.monotonic():
+            CACHE_REQUESTS.labels("tier_local", "hit").inc()
+            return entry[0]
+
+        key = f"{self.KEY_PREFIX}{user_id}"
+        generation_key = f"{self.GENERATION_PREFIX}{user_id}"
+        tier = generation = None
+        cached = redis_client.available
+        if cached:
+            try:
+                tier, generation = await redis_client.get_many(key, generation_key)
+            except Exception as e:
+                cached = False
+                logger.warning(f"Tier cache read failed, using DB: {e}")
+
+        CACHE_REQUESTS.labels("tier_redis", "miss" if tier is None else "hit").inc()
+        if tier is None:
+            async with async_session() as session:
+                tier = await session.scalar(select(User.tier).where(User.id == user_id))
+            if tier is None:
+                # Not synced yet: trust the token, but don't cache it
+                return fallback
+            if cached:
+                try:
+                    stored = await redis_client.tracked(redis_client.client.eval(
+                        _SET_IF_GENERATION, 2, key, generation_key,
+                        generation or "", tier, settings.tier_cache_redis_ttl,
+                    ))
+                except Exception as e:
+                    logger.warning(f"Tier cache write failed: {e}")
+                else:
+                    if not stored:
+                        # Invalidated while we read the DB: this tier may be stale
+                        return tier
+
+        self._remember(user_id, tier)
+        return tier
+
+    async def invalidate(self, *user_ids: str):
+        """Drop cached tiers after a committed change to users.tier."""
+        for user_id in user_ids:
+            self._local.pop(user_id, None)
+        if not user_ids:
+            return
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                for user_id in user_ids:
+                    generation_key = f"{self.GENERATION_PREFIX}{user_id}"
+                    pipe.incr(generation_key)
+                    # Only has to outlive resolves already in flight
+                    pipe.expire(generation_key, settings.tier_cache_redis_ttl)
+                    pipe.delete(f"{self.KEY_PREFIX}{user_id}")
+                await redis_client.tracked(pipe.execute())
+        except Exception as e:
+            # The change is committed; worst case it shows up after the Redis TTL
+            logger.warning(f"Tier cache invalidation failed for {user_ids}: {e}")
+
+    def _remember(self, user_id: str, tier: str):
+        # Cheap bound: the dict only holds users active within the TTL window
+        if len(self._local) >= settings.tier_cache_local_size:
+            now = time.monotonic()
+            self._local = {k: v for k, v in self._local.items() if v[1] > now}
+            if len(self._local) >= settings.tier_cache_local_size:
+                self._local.clear()
+        self._local[user_id] = (tier, time.monotonic() + settings.tier_cache_local_ttl)
+
+
+tier_resolver = TierResolver()
@@ -0,0 +1,104 @@
+"""
+Optional OpenTelemetry tracing.
+
+Off unless OTEL_ENABLED=true. When enabled, setup_tracing() instruments:
+  - FastAPI: one server span per request, continuing the W3C
+    traceparent forwarded by the Next.js proxy
+  - SQLAlchemy: a span per statement on the primary and replica engines
+  - redis-py: a span per command / pipeline
+  - httpx: outgoing requests (URL fetches, Stripe, and the Anthropic
+    SDK's HTTP calls)
+plus a manual span around each Anthropic messages.create (see span()).
+
+Exporters (OTEL_EXPORTER):
+  - otlp:    OTLP/HTTP to OTEL_ENDPOINT (e.g. a local collector)
+  - file:    one JSON span per line appended to OTEL_FILE_PATH, works offline
+  - console: pretty-printed spans on stdout
+
+The OpenTelemetry packages are imported only when enabled; if they are
+missing, tracing stays off with a warning.
+"""
+
+import logging
+from contextlib import contextmanager
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+
+
+def _exporter():
+    if settings.otel_exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=f"{settings.otel_endpoint.rstrip('/')}/v1/traces")
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if settings.otel_exporter == "file":
+        out = open(settings.otel_file_path, "a", buffering=1)
+        return ConsoleSpanExporter(
+            out=out, formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    return ConsoleSpanExporter()
+
+
+def setup_tracing(app):
+    """Install the tracer provider and instrument the app. No-op when disabled."""
+    global _tracer
+    if not settings.otel_enabled or _tracer is not None:
+        return
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError as e:
+        logger.warning(f"OTEL_ENABLED is set but OpenTelemetry is not installed: {e}")
+        return
+
+    from app.core.database import engine, read_engine
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.otel_service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.otel_sample_ratio)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(_exporter()))
+    trace.set_tracer_provider(provider)
+
+    # Entries are regex searches over the full URL, so anchor them
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="/health$,/ready$,/metrics$")
+    engines = {engine.sync_engine, read_engine.sync_engine}
+    SQLAlchemyInstrumentor().instrument(engines=list(engines))
+    RedisInstrumentor().instrument()
+    HTTPXClientInstrumentor().instrument()
+
+    _tracer = trace.get_tracer("app")
+    logger.info(f"Tracing enabled, exporting via {settings.otel_exporter}")
+
+
+def shutdown_tracing():
+    """Flush pending spans."""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    trace.get_tracer_provider().shutdown()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Manual child span; yields None when tracing is off."""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
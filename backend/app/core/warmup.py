@@ -0,0 +1,144 @@
+"""
+Startup pre-warming and readiness, run from the lifespan.
+
+Without pre-warming the first requests after a deploy pay for TCP/TLS
+handshakes to Postgres and Redis and the first stats fetch. Those are
+awaited before the worker serves traffic. The Anthropic and Stripe SDKs
+take over a second to import, so they are loaded in a background thread
+after startup instead of blocking it. Each step is best-effort: a
+failure is logged and the same work happens lazily on first use.
+
+/ready reports the result (see Warmup.report), separately from /health,
+which only says the process is alive.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+from contextlib import suppress
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine, read_engine
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_stats(eng) -> dict[str, int]:
+    pool = eng.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+async def _warm_engine(eng, count: int):
+    """Open `count` pooled connections at once so they sit idle in the pool."""
+    async def checkout():
+        async with eng.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            # Hold until all are open, or the pool just reuses one connection
+            await asyncio.sleep(0.05)
+
+    await asyncio.gather(*(checkout() for _ in range(count)))
+
+
+async def _warm_redis(count: int):
+    await asyncio.gather(*(redis_client.ping() for _ in range(count)))
+
+
+async def _warm_stats():
+    from app.services.stats_service import stats_service
+
+    await stats_service.get_stats()
+
+
+async def _warm_clients():
+    from app.services.scanner_service import scanner_service
+    from app.services.stripe_service import stripe_service
+
+    # Import off the event loop; building the clients afterwards is cheap
+    for module in ("anthropic", "stripe"):
+        await asyncio.to_thread(importlib.import_module, module)
+    scanner_service.http
+    scanner_service.client
+    if settings.stripe_secret_key:
+        stripe_service.client
+
+
+class Warmup:
+    """Tracks pre-warm progress for the readiness probe."""
+
+    def __init__(self):
+        self.steps: dict[str, bool] = {}
+        self.started_at = time.monotonic()
+        self.ready_at: float | None = None
+        self._background: asyncio.Task | None = None
+
+    async def _step(self, name: str, work):
+        try:
+            await work
+        except Exception as e:
+            self.steps[name] = False
+            logger.warning(f"Pre-warm step {name} failed: {e}")
+        else:
+            self.steps[name] = True
+
+    async def run(self):
+        """Warm pools and caches, then load SDK clients in the background. Never raises."""
+        start = time.monotonic()
+        connections = min(settings.prewarm_connections, settings.db_pool_size)
+        steps = {
+            "db": _warm_engine(engine, connections),
+            "redis": _warm_redis(min(settings.prewarm_connections, settings.redis_max_connections)),
+            "stats": _warm_stats(),
+        }
+        if read_engine is not engine:
+            steps["db_replica"] = _warm_engine(read_engine, connections)
+        await asyncio.gather(*(self._step(name, work) for name, work in steps.items()))
+
+        self.ready_at = time.monotonic()
+        logger.info(
+            f"Pre-warmed in {(self.ready_at - start) * 1000:.0f}ms, "
+            f"{self.ready_at - self.started_at:.2f}s after startup began"
+        )
+        self._background = asyncio.create_task(self._step("clients", _warm_clients()))
+
+    async def stop(self):
+        if self._background:
+            self._background.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._background
+            self._background = None
+
+    async def report(self) -> tuple[bool, dict]:
+        """(ready, details). Ready once warmed and the primary database answers."""
+        try:
+            async with asyncio.timeout(settings.ready_db_timeout):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            db_ok = True
+        except Exception:
+            db_ok = False
+
+        details = {
+            "status": "ready" if db_ok and self.ready_at else "not_ready",
+            "startup_seconds": (
+                round(self.ready_at - self.started_at, 3) if self.ready_at else None
+            ),
+            "warmed": self.steps,
+            "database": {"ok": db_ok, "pool": _pool_stats(engine)},
+            # Redis down is degraded mode, not unready (see RedisClient)
+            "redis": {"available": redis_client.available, "pool": redis_client.pool_stats()},
+        }
+        if read_engine is not engine:
+            details["database"]["replica_pool"] = _pool_stats(read_engine)
+        return db_ok and self.ready_at is not None, details
+
+
+warmup = Warmup()
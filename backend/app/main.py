@@ -6,36 +6,61 @@ FastAPI application serving:
   - URL scanner (Claude AI powered)
   - User management
   - Stripe webhook handling
-  - Health checks
+  - Health/readiness checks and Prometheus metrics
+
+Schema changes are applied by `python -m app.cli migrate` before the
+server starts, never from the lifespan, so workers boot quickly.
 """
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.config import settings, validate_settings
+from app.core.database import dispose_engines
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import render as render_metrics
 from app.core.redis import redis_client
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.core.warmup import warmup
+from app.services.scan_writer import scan_writer
+from app.services.scanner_service import scanner_service
+from app.services.stripe_service import stripe_service
+from app.services.usage_ledger import usage_ledger
+from app.services.webhook_inbox import webhook_inbox
 
-# CRITICAL: import all models so SQLAlchemy knows about them
-# for Base.metadata.create_all() to work
+# Import all models so relationships between them resolve
 import app.models  # noqa: F401
 
-from app.api.v1 import stats, scanner, users, webhooks
+from app.api.v1 import admin, stats, scanner, users, webhooks
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup/shutdown events."""
-    # Startup: create tables (dev only, use alembic in prod)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    validate_settings()
+    await loop_monitor.start()
     # Connect redis
     await redis_client.connect()
+    await scan_writer.start()
+    await webhook_inbox.start()
+    await usage_ledger.start()
+    # Pay connection setup costs before taking traffic
+    await warmup.run()
     yield
-    # Shutdown
+    # Shutdown: drain buffered scans before the pool goes away
+    await warmup.stop()
+    await webhook_inbox.stop()
+    await usage_ledger.stop()
+    await scan_writer.stop()
+    await stripe_service.close()
+    await scanner_service.close()
     await redis_client.close()
-    await engine.dispose()
+    await dispose_engines()
+    shutdown_tracing()
+    await loop_monitor.stop()
 
 
 app = FastAPI(
@@ -43,9 +68,18 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",  # Always available, useful for debugging
     redoc_url="/redoc" if settings.debug else None,
+    default_response_class=ORJSONResponse,  # See app.core.responses
     lifespan=lifespan,
 )
 
+setup_tracing(app)
+
+# Profiling: the middleware isn't even installed unless enabled
+if settings.profiling_enabled:
+    from app.core.profiling import ProfilingMiddleware
+
+    app.add_middleware(ProfilingMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -60,9 +94,23 @@ app.include_router(stats.router, prefix="/api/v1/stats", tags=["stats"])
 app.include_router(scanner.router, prefix="/api/v1/scanner", tags=["scanner"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(webhooks.router, prefix="/api/v1/webhooks", tags=["webhooks"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (internal network only, see app.core.metrics)."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/health")
 async def health_check():
-    """Health check for Docker and load balancers."""
+    """Liveness check for Docker: the process is up and serving."""
     return {"status": "alive", "service": "deadinternet-api"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check for load balancers: warmed up and the database answers."""
+    ready, details = await warmup.report()
+    return ORJSONResponse(details, status_code=200 if ready else 503)
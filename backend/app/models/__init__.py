@@ -1,5 +1,7 @@
 from app.models.user import User
 from app.models.scan import Scan
 from app.models.subscription import Subscription
+from app.models.token_usage import TokenUsage
+from app.models.webhook_event import WebhookEvent
 
-__all__ = ["User", "Scan", "Subscription"]
+__all__ = ["User", "Scan", "Subscription", "TokenUsage", "WebhookEvent"]
@@ -1,23 +1,56 @@
 """
 Scan model - stores URL analysis results from Claude.
 Keeps history for premium users and analytics.
+
+The table is range-partitioned by month on created_at. Partitions past the
+retention window are archived to disk by PartitionService.
 """
 
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Float, Text, DateTime, ForeignKey, func
+from sqlalchemy import (
+    DDL, Computed, String, Float, Text, DateTime, ForeignKey, Index, event, func, text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 
+# Full-text search config, shared by the generated column and queries
+TEXT_SEARCH_CONFIG = "english"
+
+# Host part of the URL, lowercased, without a leading "www."
+DOMAIN_EXPRESSION = (
+    "regexp_replace(lower(substring(url from '^[A-Za-z][A-Za-z0-9+.-]*://([^/:?#]+)')), "
+    "'^www\\.', '')"
+)
+
+SEARCH_VECTOR_EXPRESSION = (
+    f"to_tsvector('{TEXT_SEARCH_CONFIG}', "
+    "coalesce(analysis, '') || ' ' || coalesce(content_snippet, ''))"
+)
+
 
 class Scan(Base):
     __tablename__ = "scans"
+    __table_args__ = (
+        # Serves history keyset pagination: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_scans_user_created_id", "user_id", text("created_at DESC"), text("id DESC")),
+        # Search: domain facet, full-text over analysis/snippet, URL substring
+        Index("ix_scans_user_domain", "user_id", "domain"),
+        Index("ix_scans_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_scans_url_trgm", "url",
+            postgresql_using="gin", postgresql_ops={"url": "gin_trgm_ops"},
+        ),
+        # Monthly partitions, managed by PartitionService
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), index=True)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
     url: Mapped[str] = mapped_column(String(2000))
 
     # Results
@@ -31,9 +64,17 @@ class Scan(Base):
     tokens_used: Mapped[int | None] = mapped_column(default=0)
     scan_duration_ms: Mapped[int | None] = mapped_column(default=0)
 
-    # Timestamp
+    # Search columns, generated by Postgres on insert
+    domain: Mapped[str | None] = mapped_column(
+        Text, Computed(DOMAIN_EXPRESSION, persisted=True)
+    )
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), deferred=True
+    )
+
+    # Timestamp - also the partition key, so it must be part of the primary key
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
     )
 
     # Relations
@@ -41,3 +82,10 @@ class Scan(Base):
 
     def __repr__(self):
         return f"<Scan {self.url[:50]} -> {self.verdict} ({self.ai_probability:.0%})>"
+
+
+# Trigram index on url needs pg_trgm before create_all() builds the table
+event.listen(
+    Scan.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
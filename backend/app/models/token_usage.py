@@ -0,0 +1,37 @@
+"""
+TokenUsage model - per user, per UTC day, per model token ledger.
+
+Rows are written by UsageLedger, which counts tokens in Redis as scans
+run and periodically adds the amounts counted since the last flush.
+"""
+
+from datetime import date, datetime
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class TokenUsage(Base):
+    __tablename__ = "token_usage"
+
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)  # UTC
+    model: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    # Model calls and tokens
+    calls: Mapped[int] = mapped_column(Integer, default=0)
+    input_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    output_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    cache_read_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+    cache_write_tokens: Mapped[int] = mapped_column(BigInteger, default=0)
+
+    # Estimated at MODEL_PRICES when recorded, in millionths of a USD
+    cost_micros: Mapped[int] = mapped_column(BigInteger, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<TokenUsage {self.user_id} {self.day} {self.model}>"
@@ -5,7 +5,7 @@ Stores user profile and current subscription tier.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, func
+from sqlalchemy import String, Integer, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -25,6 +25,9 @@ class User(Base):
     tier: Mapped[str] = mapped_column(String(20), default="ghost")  # ghost|hunter|operator
     stripe_customer_id: Mapped[str | None] = mapped_column(String(255))
 
+    # Maintained on scan insert so history totals never need COUNT(*)
+    scan_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -0,0 +1,46 @@
+"""
+WebhookEvent model - durable inbox for Stripe webhook events.
+
+The webhook endpoint only verifies and stores events here; WebhookInbox
+processes them in the background, in order per customer, with retries.
+The Stripe event id is the primary key, so redeliveries are no-ops.
+"""
+
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, DateTime, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class WebhookEvent(Base):
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # Claim query: due pending events, oldest first
+        Index("ix_webhook_events_due", "status", "next_attempt_at"),
+        # Per-customer ordering check
+        Index("ix_webhook_events_customer", "customer_id", "event_created"),
+    )
+
+    id: Mapped[str] = mapped_column(String(255), primary_key=True)  # Stripe evt_...
+    type: Mapped[str] = mapped_column(String(100))
+    customer_id: Mapped[str | None] = mapped_column(String(255))
+    payload: Mapped[str] = mapped_column(Text)  # Raw verified event JSON
+
+    # Processing state
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending|done|dead
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    # Timestamps
+    event_created: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # Stripe's clock
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<WebhookEvent {self.id} {self.type} [{self.status}]>"
@@ -3,8 +3,10 @@ Pydantic schemas for scan endpoints.
 Request/response validation and serialization.
 """
 
-from pydantic import BaseModel, HttpUrl
-from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter
+from datetime import date, datetime
 
 
 # --- Requests ---
@@ -12,6 +14,24 @@ from datetime import datetime
 class ScanRequest(BaseModel):
     """POST /api/v1/scanner/scan"""
     url: HttpUrl
+    # Wait for the scan row to be committed before responding (read-your-writes)
+    durable: bool = False
+
+
+class ScanSearchParams(BaseModel):
+    """GET /api/v1/scanner/search query params. All filters are optional and ANDed."""
+    q: str | None = Field(None, max_length=200)  # Words in analysis/content_snippet
+    url: str | None = Field(None, max_length=2000)  # URL substring
+    domain: str | None = Field(None, max_length=255)  # Exact host, "www." ignored
+    verdict: Literal["human", "mixed", "ai_generated"] | None = None
+    min_probability: float | None = Field(None, ge=0.0, le=1.0)
+    max_probability: float | None = Field(None, ge=0.0, le=1.0)
+    since: datetime | None = None
+    until: datetime | None = None
+
+    # Pagination, same semantics as /history
+    limit: int = 20
+    cursor: str | None = None
 
 
 # --- Responses ---
@@ -43,3 +63,48 @@ class ScanResponse(BaseModel):
     """Full scan response with usage info."""
     result: ScanResult
     usage: ScanUsage
+
+
+class ScanPage(BaseModel):
+    """One page of scans (search, archive)."""
+    scans: list[ScanResult]
+    limit: int
+    next_cursor: str | None
+
+
+class ScanHistory(ScanPage):
+    """One page of /history, with the user's total scan count."""
+    total: int
+
+
+class TokenBudget(BaseModel):
+    """Today's model token budget."""
+    used: int
+    limit: int
+    remaining: int
+
+
+class TokenUsageDay(BaseModel):
+    """Token ledger entry for one UTC day and model."""
+    day: date
+    model: str
+    calls: int
+    input_tokens: int
+    output_tokens: int
+    cache_write_tokens: int
+    cache_read_tokens: int
+    cost_usd: float  # Estimated
+
+
+class TokenUsageReport(BaseModel):
+    """GET /api/v1/scanner/usage/tokens"""
+    budget: TokenBudget | None  # None: the tier has no token budget
+    days: list[TokenUsageDay]
+    total_tokens: int
+    total_cost_usd: float
+
+
+# Built once at import; used by app.core.responses.typed_response
+SCAN_RESPONSE = TypeAdapter(ScanResponse)
+SCAN_PAGE = TypeAdapter(ScanPage)
+SCAN_HISTORY = TypeAdapter(ScanHistory)
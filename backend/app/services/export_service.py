@@ -0,0 +1,171 @@
+"""
+Export Service - bulk scan history downloads.
+
+Streams a user's scans straight from a server-side cursor into
+NDJSON, CSV or Parquet without materialising the result set:
+  - Rows are selected as plain columns (no ORM entities, no identity map)
+  - The DB cursor is read in batches of EXPORT_BATCH_SIZE
+  - Each batch is encoded and flushed to the client before the next is read
+
+Every NDJSON/CSV row carries a `cursor` value. An interrupted download can be
+resumed by passing the last received cursor back as ?cursor=.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from app.core.database import read_session
+from app.core.pagination import encode_cursor, newest_first
+from app.models.scan import Scan
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    Scan.id,
+    Scan.url,
+    Scan.ai_probability,
+    Scan.verdict,
+    Scan.analysis,
+    Scan.content_snippet,
+    Scan.model_used,
+    Scan.tokens_used,
+    Scan.scan_duration_ms,
+    Scan.created_at,
+)
+
+FIELDNAMES = [c.key for c in EXPORT_COLUMNS] + ["cursor"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since last drain.
+
+    ParquetWriter records byte offsets in the footer, so tell() must keep
+    counting even though the written bytes are discarded after each drain.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ExportService:
+    """Encodes scan history batches into downloadable formats."""
+
+    async def _batches(
+        self, user_id: str, after: tuple[datetime, str] | None
+    ) -> AsyncIterator[list[dict]]:
+        """Yield lists of row dicts read from a server-side cursor."""
+        stmt = newest_first(
+            select(*EXPORT_COLUMNS).where(Scan.user_id == user_id), after
+        ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+        # Own session: the request-scoped one is closed before streaming starts
+        async with read_session() as session:
+            result = await session.stream(stmt)
+            async for partition in result.mappings().partitions():
+                rows = []
+                for row in partition:
+                    item = dict(row)
+                    item["cursor"] = encode_cursor(row["created_at"], row["id"])
+                    rows.append(item)
+                yield rows
+
+    async def stream(
+        self, user_id: str, fmt: str, after: tuple[datetime, str] | None = None
+    ) -> AsyncIterator[bytes]:
+        """Stream the user's scans, newest first, encoded as `fmt`."""
+        batches = self._batches(user_id, after)
+        if fmt == "ndjson":
+            encoder = self._ndjson(batches)
+        elif fmt == "csv":
+            # A resumed download is appended to the first part: no second header
+            encoder = self._csv(batches, header=after is None)
+        elif fmt == "parquet":
+            encoder = self._parquet(batches)
+        else:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        async for chunk in encoder:
+            yield chunk
+
+    async def _ndjson(self, batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+        async for rows in batches:
+            yield "".join(
+                json.dumps(row, default=datetime.isoformat) + "\n" for row in rows
+            ).encode()
+
+    async def _csv(
+        self, batches: AsyncIterator[list[dict]], header: bool = True
+    ) -> AsyncIterator[bytes]:
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=FIELDNAMES)
+        if header:
+            writer.writeheader()
+        async for rows in batches:
+            for row in rows:
+                row["created_at"] = row["created_at"].isoformat()
+                writer.writerow(row)
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+        # Header only, for users with no scans
+        if buf.tell():
+            yield buf.getvalue().encode()
+
+    async def _parquet(self, batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+        # Imported lazily: pyarrow is large and only needed for this format
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("id", pa.string()),
+            ("url", pa.string()),
+            ("ai_probability", pa.float64()),
+            ("verdict", pa.string()),
+            ("analysis", pa.string()),
+            ("content_snippet", pa.string()),
+            ("model_used", pa.string()),
+            ("tokens_used", pa.int64()),
+            ("scan_duration_ms", pa.int64()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+            ("cursor", pa.string()),
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            async for rows in batches:
+                # One row group per DB batch keeps memory flat
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+
+export_service = ExportService()
@@ -0,0 +1,261 @@
+"""
+Partition Service - monthly partitions and archival for the scans table.
+
+scans is RANGE-partitioned on created_at with one partition per calendar
+month, named scans_pYYYY_MM. This service:
+  - Creates partitions ahead of time so inserts never miss a partition
+  - Detaches partitions older than the retention window, archives them to
+    zstd-compressed Parquet files on local disk, then drops them
+  - Reads archived months back on demand
+
+Run maintenance daily: python -m app.cli partitions
+"""
+
+import asyncio
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Serializes partition DDL across workers and cron runs
+_ADVISORY_LOCK_KEY = 0x5CA75
+
+_PARTITION_RE = re.compile(r"^scans_p(\d{4})_(\d{2})$")
+
+ARCHIVE_BATCH_SIZE = 5000
+
+# Column order for archive files; generated columns are rebuilt on read
+ARCHIVE_COLUMNS = [
+    "id", "user_id", "url", "ai_probability", "verdict", "analysis",
+    "content_snippet", "model_used", "tokens_used", "scan_duration_ms", "created_at",
+]
+
+
+def add_months(month: date, n: int) -> date:
+    """First day of the month n months after `month`."""
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    today = datetime.now(timezone.utc).date()
+    return today.replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"scans_p{month:%Y_%m}"
+
+
+def parse_partition_name(name: str) -> date | None:
+    match = _PARTITION_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _archive_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.string()),
+        ("user_id", pa.string()),
+        ("url", pa.string()),
+        ("ai_probability", pa.float64()),
+        ("verdict", pa.string()),
+        ("analysis", pa.string()),
+        ("content_snippet", pa.string()),
+        ("model_used", pa.string()),
+        ("tokens_used", pa.int64()),
+        ("scan_duration_ms", pa.int64()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+class PartitionService:
+    """Creates, archives and reads back monthly scan partitions."""
+
+    @property
+    def archive_dir(self) -> Path:
+        return Path(settings.scan_archive_dir)
+
+    def archive_path(self, month: date) -> Path:
+        return self.archive_dir / f"{partition_name(month)}.parquet"
+
+    # ── Partition creation ──────────────────────────────────────────
+
+    async def ensure_partitions(self, conn: AsyncConnection) -> list[str]:
+        """Create partitions for this month and the next few. Idempotent."""
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}
+        )
+        existing = set(await self._attached(conn))
+        created = []
+        start = current_month()
+        for i in range(settings.scan_partitions_ahead + 1):
+            month = add_months(start, i)
+            if month in existing:
+                continue
+            # Names and bounds come from dates, never from user input
+            await conn.execute(text(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF scans "
+                f"FOR VALUES FROM ('{month.isoformat()}') "
+                f"TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(partition_name(month))
+        if created:
+            logger.info(f"Created scan partitions: {', '.join(created)}")
+        return created
+
+    async def _attached(self, conn: AsyncConnection) -> list[date]:
+        """Months currently attached to scans."""
+        result = await conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'scans'::regclass"
+        ))
+        return sorted(m for (name,) in result if (m := parse_partition_name(name)))
+
+    async def _detached(self, conn: AsyncConnection) -> list[date]:
+        """Months left detached by an interrupted archive run."""
+        result = await conn.execute(text(
+            "SELECT c.relname FROM pg_class c "
+            "WHERE c.relkind = 'r' AND c.relname LIKE 'scans\\_p%' "
+            "AND NOT c.relispartition"
+        ))
+        return sorted(m for (name,) in result if (m := parse_partition_name(name)))
+
+    # ── Retention ───────────────────────────────────────────────────
+
+    async def archive_expired(self) -> list[str]:
+        """Archive and drop every partition older than the retention window."""
+        cutoff = add_months(current_month(), -settings.scan_retention_months)
+        async with engine.connect() as conn:
+            attached = [m for m in await self._attached(conn) if m < cutoff]
+            leftover = await self._detached(conn)
+
+        archived = []
+        for month in sorted(set(attached) | set(leftover)):
+            await self.archive_partition(month, detach=month in attached)
+            archived.append(partition_name(month))
+        return archived
+
+    async def archive_partition(self, month: date, detach: bool = True):
+        """Detach one month, write it to Parquet, adjust counters, drop it."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        name = partition_name(month)
+        if detach:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"ALTER TABLE scans DETACH PARTITION {name}"))
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        path = self.archive_path(month)
+        tmp = path.with_suffix(".parquet.tmp")
+        schema = _archive_schema()
+
+        # Sorted by user so per-user reads can skip row groups via statistics
+        query = text(
+            f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM {name} "
+            "ORDER BY user_id, created_at DESC, id DESC"
+        ).execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+
+        rows_written = 0
+        async with engine.connect() as conn:
+            result = await conn.stream(query)
+            with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+                async for partition in result.mappings().partitions():
+                    writer.write_table(
+                        pa.Table.from_pylist([dict(r) for r in partition], schema=schema)
+                    )
+                    rows_written += len(partition)
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+        async with engine.begin() as conn:
+            # Archived scans leave the history total
+            await conn.execute(text(
+                "UPDATE users SET scan_count = GREATEST(users.scan_count - counts.n, 0) "
+                f"FROM (SELECT user_id, COUNT(*) AS n FROM {name} GROUP BY user_id) AS counts "
+                "WHERE users.id = counts.user_id"
+            ))
+            await conn.execute(text(f"DROP TABLE {name}"))
+
+        logger.info(f"Archived {name}: {rows_written} rows -> {path}")
+
+    # ── Archive reads ───────────────────────────────────────────────
+
+    async def archived_months(self, user_id: str) -> list[date]:
+        """Archived months that contain scans by the user, newest first."""
+
+        def _months() -> list[date]:
+            import pyarrow.parquet as pq
+
+            if not self.archive_dir.is_dir():
+                return []
+            months = []
+            for path in self.archive_dir.glob("*.parquet"):
+                month = parse_partition_name(path.stem)
+                if not month:
+                    continue
+                # Files are sorted by user, so row group stats skip most of it
+                matches = pq.read_table(
+                    path, columns=["id"], filters=[("user_id", "=", user_id)]
+                )
+                if matches.num_rows:
+                    months.append(month)
+            return sorted(months, reverse=True)
+
+        # Directory listing and Parquet reads are blocking
+        return await asyncio.to_thread(_months)
+
+    async def read_archive(
+        self,
+        month: date,
+        user_id: str,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[dict] | None:
+        """
+        Up to `limit` of one user's scans from an archived month, newest
+        first, starting just after a decoded cursor. Returns None if the
+        month is not archived.
+        """
+        path = self.archive_path(month)
+        if not path.exists():
+            return None
+
+        def _read() -> list[dict]:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            import pyarrow.dataset as ds
+
+            condition = pc.field("user_id") == user_id
+            if after:
+                created_at = pa.scalar(after[0], type=pa.timestamp("us", tz="UTC"))
+                condition &= (pc.field("created_at") < created_at) | (
+                    (pc.field("created_at") == created_at) & (pc.field("id") < after[1])
+                )
+            columns = [c for c in ARCHIVE_COLUMNS if c != "user_id"]
+            # Rows are stored newest first within each user, so the first
+            # `limit` matches are the page; head() stops decoding there
+            scanner = ds.dataset(path, format="parquet").scanner(
+                columns=columns, filter=condition
+            )
+            return scanner.head(limit).to_pylist()
+
+        # Parquet decoding is blocking; keep it off the event loop
+        return await asyncio.to_thread(_read)
+
+
+partition_service = PartitionService()
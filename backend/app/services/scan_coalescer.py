@@ -0,0 +1,171 @@
+"""
+Scan Coalescer - single-flight deduplication of identical in-flight scans.
+
+Concurrent scans of the same normalized URL share one analysis:
+  1. In-process: the first request starts the analysis, later ones
+     await the same task.
+  2. Across workers: that task takes a Redis lock scan:inflight:{hash}.
+     The holder runs ScannerService.analyze(), stores the result under
+     scan:result:{hash} for SCAN_COALESCE_RESULT_TTL seconds and
+     publishes on scan:done:{hash}. Other workers subscribe and read the
+     stored result instead of calling the model.
+
+Only the analysis is shared: every request still passes its own rate
+limit check and writes its own Scan row. The model call's tokens are
+charged once, to the request that started it. Without Redis (or if the lock
+holder disappears) a worker falls back to analyzing on its own.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from urllib.parse import urlsplit, urlunsplit
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.core.redis import redis_client
+from app.services.scanner_service import scanner_service
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class CoalescedScanError(Exception):
+    """The shared analysis failed in another worker."""
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used to match identical scans."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+class ScanCoalescer:
+    """Shares one ScannerService.analyze() call between identical scans."""
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def analyze(self, url: str, user_id: str | None = None) -> dict:
+        if not settings.scan_coalesce_enabled:
+            return await scanner_service.analyze(url, user_id)
+
+        key = hashlib.sha256(normalize_url(url).encode()).hexdigest()
+        task = self._inflight.get(key)
+        CACHE_REQUESTS.labels("scan_inflight", "miss" if task is None else "hit").inc()
+        if task is None:
+            task = asyncio.create_task(self._analyze_once(key, url, user_id))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded: one caller disconnecting must not cancel the others' scan
+        result = await asyncio.shield(task)
+        return dict(result)
+
+    async def _analyze_once(self, key: str, url: str, user_id: str | None) -> dict:
+        if not redis_client.available:
+            return await scanner_service.analyze(url, user_id)
+
+        lock_key = f"scan:inflight:{key}"
+        token = uuid.uuid4().hex
+        try:
+            leader = await redis_client.client.set(
+                lock_key, token, nx=True, ex=settings.scan_coalesce_ttl
+            )
+        except Exception as e:
+            logger.warning(f"Scan coalescing unavailable, scanning locally: {e}")
+            return await scanner_service.analyze(url, user_id)
+
+        if leader:
+            return await self._lead(key, lock_key, token, url, user_id)
+
+        result = await self._follow(key)
+        CACHE_REQUESTS.labels("scan_shared", "miss" if result is None else "hit").inc()
+        if result is None:
+            logger.info(f"No shared result for {url}, scanning locally")
+            return await scanner_service.analyze(url, user_id)
+        return result
+
+    async def _lead(
+        self, key: str, lock_key: str, token: str, url: str, user_id: str | None
+    ) -> dict:
+        channel = f"scan:done:{key}"
+        try:
+            result = await scanner_service.analyze(url, user_id)
+        except Exception as e:
+            await self._finish(lock_key, token, channel, f"error:{e}")
+            raise
+        try:
+            await redis_client.set_object(
+                f"scan:result:{key}", result, ttl=settings.scan_coalesce_result_ttl
+            )
+        except Exception as e:
+            logger.warning(f"Could not share scan result for {url}: {e}")
+        await self._finish(lock_key, token, channel, "ok")
+        return result
+
+    async def _finish(self, lock_key: str, token: str, channel: str, message: str):
+        try:
+            async with redis_client.pipeline() as pipe:
+                pipe.publish(channel, message)
+                pipe.eval(_RELEASE_LOCK, 1, lock_key, token)
+                await pipe.execute()
+        except Exception as e:
+            # Followers time out and scan on their own
+            logger.warning(f"Could not release scan lock {lock_key}: {e}")
+
+    async def _follow(self, key: str) -> dict | None:
+        """Wait for another worker's result. None means scan locally."""
+        result_key = f"scan:result:{key}"
+        deadline = time.monotonic() + settings.scan_coalesce_ttl
+        pubsub = redis_client.client.pubsub()
+        try:
+            await pubsub.subscribe(f"scan:done:{key}")
+            # The leader may have finished before we subscribed
+            result = await redis_client.get_object(result_key)
+            if result is not None:
+                return result
+            if not await redis_client.client.exists(f"scan:inflight:{key}"):
+                return None
+
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=min(remaining, 1.0)
+                )
+                if message is None:
+                    # Lock gone without a message: the holder died mid-scan
+                    if not await redis_client.client.exists(f"scan:inflight:{key}"):
+                        return await redis_client.get_object(result_key)
+                    continue
+                data = message["data"]
+                if data.startswith("error:"):
+                    raise CoalescedScanError(data.removeprefix("error:"))
+                return await redis_client.get_object(result_key)
+            return None
+        except CoalescedScanError:
+            raise
+        except Exception as e:
+            logger.warning(f"Waiting for shared scan result failed: {e}")
+            return None
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+
+scan_coalescer = ScanCoalescer()
@@ -0,0 +1,208 @@
+"""
+Scan Writer - persists Scan rows, optionally through a write-behind buffer.
+
+With SCAN_WRITE_BUFFER_ENABLED=false (default) every write is its own
+transaction, as before. When enabled, rows are collected in memory and
+flushed as one multi-row INSERT per batch, either when the buffer reaches
+SCAN_WRITE_BATCH_SIZE rows or every SCAN_WRITE_FLUSH_MS milliseconds.
+The per-user scan_count update is folded into the same transaction.
+
+Callers that need read-your-writes pass durable=True, which forces a
+flush and waits for the commit. The buffer is drained on shutdown.
+
+If the database is unreachable (connection errors, timeouts), the batch
+goes back to the front of the buffer and flushing backs off up to
+SCAN_WRITE_RETRY_MAX_SECONDS; durable callers get the error right away.
+Once SCAN_WRITE_MAX_BUFFERED rows are waiting, new writes bypass the
+buffer so the caller sees the failure instead of memory growing. Only
+rows the database rejects (constraint or data errors) are dropped.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.scan import Scan
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_scans = Scan.__table__
+_users = User.__table__
+
+# asyncpg allows at most 32767 bind parameters per statement
+_MAX_PARAMS = 32767
+
+
+def _is_transient(error: Exception) -> bool:
+    """True for failures that say nothing about the rows (DB down, pool exhausted)."""
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or isinstance(error, (OperationalError, InterfaceError))
+    return isinstance(error, (OSError, asyncio.TimeoutError, PoolTimeoutError))
+
+
+class ScanWriter:
+    """Batches Scan inserts to cut per-scan transactions."""
+
+    def __init__(self):
+        self._buffer: list[tuple[dict, asyncio.Future | None]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._flush_lock: asyncio.Lock | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def buffered(self) -> bool:
+        return self._task is not None
+
+    @staticmethod
+    def new_row(user_id: str, url: str, result: dict) -> dict:
+        """
+        Build a complete scans row. id and created_at are set here so the
+        response doesn't depend on the insert having happened yet.
+        """
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "url": url,
+            "created_at": datetime.now(timezone.utc),
+            **result,
+        }
+
+    async def start(self):
+        """Start the background flusher if buffering is enabled."""
+        if not settings.scan_write_buffer_enabled or self._task:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name="scan-writer")
+
+    async def stop(self):
+        """Stop the flusher and drain whatever is still buffered."""
+        if not self._task:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Could not drain scan buffer, {len(self._buffer)} rows lost: {e}")
+
+    async def write(self, row: dict, durable: bool = False):
+        """
+        Persist a scans row. Returns once the row is queued, or once it is
+        committed when durable=True or buffering is off.
+        """
+        # A full buffer means the DB has been failing: write through so the
+        # caller sees the error rather than the buffer growing without bound
+        if not self.buffered or len(self._buffer) >= settings.scan_write_max_buffered:
+            await self._insert([row])
+            return
+
+        waiter = asyncio.get_running_loop().create_future() if durable else None
+        self._buffer.append((row, waiter))
+        if durable or len(self._buffer) >= settings.scan_write_batch_size:
+            self._wakeup.set()
+        if waiter:
+            await waiter
+
+    async def flush(self):
+        """
+        Write out everything currently buffered, one batch at a time.
+        Raises on a transient DB failure, with the unwritten rows requeued.
+        """
+        if not self._flush_lock:
+            return
+        async with self._flush_lock:
+            while self._buffer:
+                size = settings.scan_write_batch_size
+                batch, self._buffer = self._buffer[:size], self._buffer[size:]
+                try:
+                    await self._insert([row for row, _ in batch])
+                except Exception as e:
+                    if _is_transient(e):
+                        self._requeue(batch, e)
+                        raise
+                    logger.exception(f"Batched scan insert failed ({len(batch)} rows), retrying row by row")
+                    await self._insert_each(batch)
+                    continue
+                for _, waiter in batch:
+                    if waiter and not waiter.done():
+                        waiter.set_result(None)
+
+    def _requeue(self, batch: list[tuple[dict, asyncio.Future | None]], error: Exception):
+        """Put unwritten rows back at the front; durable callers fail now instead of waiting."""
+        kept = []
+        for row, waiter in batch:
+            if waiter:
+                if not waiter.done():
+                    waiter.set_exception(error)
+            else:
+                kept.append((row, None))
+        self._buffer[:0] = kept
+
+    async def _run(self):
+        interval = settings.scan_write_flush_ms / 1000
+        delay = 0.0
+        while True:
+            if delay:
+                await asyncio.sleep(delay)
+            else:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            self._wakeup.clear()
+            try:
+                # Shielded so stop() can't cancel a batch halfway through
+                await asyncio.shield(self.flush())
+                delay = 0.0
+            except Exception as e:
+                delay = min(max(delay * 2, interval), settings.scan_write_retry_max_seconds)
+                logger.warning(
+                    f"Scan writer flush failed, retrying in {delay:.1f}s "
+                    f"({len(self._buffer)} rows buffered): {e}"
+                )
+
+    async def _insert_each(self, batch: list[tuple[dict, asyncio.Future | None]]):
+        """Isolate bad rows after a batch failure so the rest still land."""
+        for i, (row, waiter) in enumerate(batch):
+            try:
+                await self._insert([row])
+            except Exception as e:
+                if _is_transient(e):
+                    self._requeue(batch[i:], e)
+                    raise
+                logger.error(f"Dropping scan {row['id']} for user {row['user_id']}: {e}")
+                if waiter and not waiter.done():
+                    waiter.set_exception(e)
+                continue
+            if waiter and not waiter.done():
+                waiter.set_result(None)
+
+    async def _insert(self, rows: list[dict]):
+        """Insert rows and bump per-user counters in one transaction."""
+        counts = Counter(row["user_id"] for row in rows)
+        chunk = _MAX_PARAMS // len(rows[0])
+        async with engine.begin() as conn:
+            # One multi-row INSERT ... VALUES per chunk; passing the rows as
+            # parameters instead would be a driver-side executemany
+            for start in range(0, len(rows), chunk):
+                await conn.execute(insert(_scans).values(rows[start:start + chunk]))
+            await conn.execute(
+                update(_users)
+                .where(_users.c.id == bindparam("uid"))
+                .values(scan_count=_users.c.scan_count + bindparam("n")),
+                [{"uid": uid, "n": n} for uid, n in counts.items()],
+            )
+
+
+scan_writer = ScanWriter()
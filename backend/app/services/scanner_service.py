@@ -13,11 +13,17 @@ import time
 import ipaddress
 import socket
 import logging
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
 import httpx
-import anthropic
 from app.core.config import settings
+from app.core.metrics import SCAN_PARSE_FAILURES, SCAN_TOKENS, stage
+from app.core.tracing import span
+from app.services.usage_ledger import usage_ledger
+
+if TYPE_CHECKING:
+    import anthropic
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +85,16 @@ def validate_url(url: str) -> str:
     return url
 
 
+# ── Text Extraction ─────────────────────────────────────────────────
+
+def extract_text(html: str) -> str:
+    """Strip script/style blocks and tags, collapse whitespace."""
+    text = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL)
+    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
 # ── Prompt Injection Mitigation ─────────────────────────────────────
 
 def sanitize_content(text: str) -> str:
@@ -130,12 +146,14 @@ class ScannerService:
     """Handles URL fetching and AI analysis."""
 
     def __init__(self):
-        self._client: anthropic.AsyncAnthropic | None = None
+        self._client: "anthropic.AsyncAnthropic | None" = None
         self._http: httpx.AsyncClient | None = None
 
     @property
-    def client(self) -> anthropic.AsyncAnthropic:
+    def client(self) -> "anthropic.AsyncAnthropic":
         if not self._client:
+            import anthropic  # Deferred: a quarter second off every cold start
+
             self._client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
         return self._client
 
@@ -150,75 +168,104 @@ class ScannerService:
             )
         return self._http
 
+    async def close(self):
+        if self._http:
+            await self._http.aclose()
+            self._http = None
+        if self._client:
+            await self._client.close()
+            self._client = None
+
     async def fetch_content(self, url: str) -> str:
         """Fetch and extract text content from URL (SSRF-safe)."""
         # Validate URL before fetching
-        validated_url = validate_url(url)
+        with stage("validation"):
+            validated_url = validate_url(url)
 
-        response = await self.http.get(validated_url)
-        response.raise_for_status()
+        with stage("fetch"):
+            response = await self.http.get(validated_url)
+            response.raise_for_status()
 
         # Reject non-text responses
         content_type = response.headers.get("content-type", "")
         if not any(t in content_type for t in ["text/html", "text/plain", "application/json"]):
             raise ValueError(f"Unsupported content type: {content_type}")
 
-        text = response.text
-        # Remove script/style blocks
-        text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL)
-        text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL)
-        text = re.sub(r'<[^>]+>', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        with stage("extraction"):
+            text = extract_text(response.text)
 
         # Sanitize against prompt injection
-        text = sanitize_content(text)
+        with stage("sanitize"):
+            text = sanitize_content(text)
 
         # Limit to ~4000 chars for Claude context
         return text[:4000]
 
-    async def analyze(self, url: str) -> dict:
-        """Full scan pipeline: fetch URL -> analyze with Claude -> return result."""
+    async def analyze(self, url: str, user_id: str | None = None) -> dict:
+        """
+        Full scan pipeline: fetch URL -> analyze with Claude -> return result.
+        The model call's tokens are charged to user_id in the usage ledger.
+        """
         start = time.monotonic()
 
         content = await self.fetch_content(url)
         snippet = content[:500]
 
-        message = await self.client.messages.create(
-            model=settings.scanner_model,
-            max_tokens=500,
-            messages=[{
-                "role": "user",
-                "content": f"{SCANNER_PROMPT}\n---\n{content}",
-            }],
-        )
-
-        raw = message.content[0].text
-        # Strip markdown backticks if Claude adds them anyway
-        raw = re.sub(r'^```json\s*', '', raw)
-        raw = re.sub(r'\s*```$', '', raw)
-
-        try:
-            result = json.loads(raw)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse Claude response: {raw[:200]}")
-            result = {
-                "ai_probability": 0.5,
-                "verdict": "mixed",
-                "analysis": "Analysis parsing failed — result may be unreliable.",
-                "signals": [],
-            }
-
-        # Validate and clamp ai_probability
-        prob = result.get("ai_probability", 0.5)
-        if not isinstance(prob, (int, float)):
-            prob = 0.5
-        prob = max(0.0, min(1.0, float(prob)))
-
-        # Validate verdict
-        valid_verdicts = {"human", "mixed", "ai_generated"}
-        verdict = result.get("verdict", "mixed")
-        if verdict not in valid_verdicts:
-            verdict = "mixed"
+        with stage("model"), span(
+            "anthropic.messages.create",
+            **{"gen_ai.system": "anthropic", "gen_ai.request.model": settings.scanner_model},
+        ) as model_span:
+            message = await self.client.messages.create(
+                model=settings.scanner_model,
+                max_tokens=500,
+                messages=[{
+                    "role": "user",
+                    "content": f"{SCANNER_PROMPT}\n---\n{content}",
+                }],
+            )
+            if model_span:
+                model_span.set_attribute("gen_ai.usage.input_tokens", message.usage.input_tokens)
+                model_span.set_attribute("gen_ai.usage.output_tokens", message.usage.output_tokens)
+        tokens = {
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+            "cache_write_tokens": message.usage.cache_creation_input_tokens or 0,
+            "cache_read_tokens": message.usage.cache_read_input_tokens or 0,
+        }
+        for field, count in tokens.items():
+            SCAN_TOKENS.labels(settings.scanner_model, field.removesuffix("_tokens")).inc(count)
+        if user_id:
+            await usage_ledger.record(user_id, settings.scanner_model, tokens)
+
+        with stage("parse"):
+            raw = message.content[0].text
+            # Strip markdown backticks if Claude adds them anyway
+            raw = re.sub(r'^```json\s*', '', raw)
+            raw = re.sub(r'\s*```$', '', raw)
+
+            try:
+                result = json.loads(raw)
+            except json.JSONDecodeError:
+                SCAN_PARSE_FAILURES.inc()
+                logger.error(f"Failed to parse Claude response: {raw[:200]}")
+                result = {
+                    "ai_probability": 0.5,
+                    "verdict": "mixed",
+                    "analysis": "Analysis parsing failed — result may be unreliable.",
+                    "signals": [],
+                }
+
+            # Validate and clamp ai_probability
+            prob = result.get("ai_probability", 0.5)
+            if not isinstance(prob, (int, float)):
+                prob = 0.5
+            prob = max(0.0, min(1.0, float(prob)))
+
+            # Validate verdict
+            valid_verdicts = {"human", "mixed", "ai_generated"}
+            verdict = result.get("verdict", "mixed")
+            if verdict not in valid_verdicts:
+                verdict = "mixed"
 
         duration_ms = int((time.monotonic() - start) * 1000)
 
@@ -228,7 +275,7 @@ class ScannerService:
             "analysis": str(result.get("analysis", ""))[:500],
             "content_snippet": snippet,
             "model_used": settings.scanner_model,
-            "tokens_used": message.usage.input_tokens + message.usage.output_tokens,
+            "tokens_used": sum(tokens.values()),
             "scan_duration_ms": duration_ms,
         }
 
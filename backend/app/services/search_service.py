@@ -0,0 +1,76 @@
+"""
+Search Service - faceted and full-text search over a user's scans.
+
+Every filter maps onto an index so large histories stay fast:
+  - q         -> GIN on the generated search_vector tsvector
+  - url       -> GIN trigram index on url (ILIKE '%...%')
+  - domain    -> (user_id, domain) btree on the generated domain column
+  - verdict, probability and date ranges -> filtered within the user's rows
+Results use the same (created_at, id) cursor pagination as /history.
+"""
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import clamp_limit, paginate_scans, split_page
+from app.models.scan import Scan, TEXT_SEARCH_CONFIG
+from app.schemas.scan import ScanSearchParams
+
+
+def like_pattern(value: str) -> str:
+    """
+    Escape LIKE wildcards and wrap for a substring match.
+    Built in Python so the planner sees one literal pattern for the trigram index.
+    """
+    escaped = value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return f"%{escaped}%"
+
+
+def normalize_domain(domain: str) -> str:
+    """Match the generated column: lowercase host without a leading 'www.'."""
+    domain = domain.strip().lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+class SearchService:
+    """Builds and runs scan search queries."""
+
+    def build_query(self, user_id: str, filters: ScanSearchParams) -> Select:
+        """Translate search filters into a Scan query scoped to one user."""
+        stmt = select(Scan).where(Scan.user_id == user_id)
+
+        if filters.q:
+            stmt = stmt.where(
+                Scan.search_vector.op("@@")(
+                    func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, filters.q)
+                )
+            )
+        if filters.url:
+            stmt = stmt.where(Scan.url.ilike(like_pattern(filters.url), escape="/"))
+        if filters.domain:
+            stmt = stmt.where(Scan.domain == normalize_domain(filters.domain))
+        if filters.verdict:
+            stmt = stmt.where(Scan.verdict == filters.verdict)
+        if filters.min_probability is not None:
+            stmt = stmt.where(Scan.ai_probability >= filters.min_probability)
+        if filters.max_probability is not None:
+            stmt = stmt.where(Scan.ai_probability <= filters.max_probability)
+        if filters.since:
+            stmt = stmt.where(Scan.created_at >= filters.since)
+        if filters.until:
+            stmt = stmt.where(Scan.created_at < filters.until)
+
+        return stmt
+
+    async def search(
+        self, db: AsyncSession, user_id: str, params: ScanSearchParams
+    ) -> tuple[list[Scan], str | None]:
+        """Run a search and return (page, next_cursor)."""
+        limit = clamp_limit(params.limit)
+        result = await db.execute(
+            paginate_scans(self.build_query(user_id, params), params.cursor, limit)
+        )
+        return split_page(list(result.scalars().all()), limit)
+
+
+search_service = SearchService()
@@ -6,9 +6,13 @@ Stats are cached in Redis and refreshed periodically.
 The seed data comes from scripts/seed_data.py.
 """
 
-import json
+import logging
+
 from app.core.redis import redis_client
 from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
 
 # Hardcoded sourced data - updated from research reports
 # This is the canonical dataset, also loadable from scripts/seed_data.py
@@ -90,26 +94,35 @@ class StatsService:
 
     CACHE_KEY = "stats:global"
 
+    def __init__(self):
+        # Last dataset seen in Redis, served while Redis is down
+        self._local = STATIC_STATS
+
     async def get_stats(self) -> dict:
         """Get stats from cache or fall back to static data."""
-        cached = await redis_client.get_cached(self.CACHE_KEY)
-        if cached:
-            return json.loads(cached)
+        if not redis_client.available:
+            return self._local
 
-        # Cache miss: use static data and cache it
-        await redis_client.set_cached(
-            self.CACHE_KEY,
-            json.dumps(STATIC_STATS),
-            ttl=settings.stats_cache_ttl,
-        )
+        try:
+            cached = await redis_client.get_object(self.CACHE_KEY)
+            CACHE_REQUESTS.labels("stats", "miss" if cached is None else "hit").inc()
+            if cached:
+                self._local = cached
+                return self._local
+
+            # Cache miss: use static data and cache it
+            await redis_client.set_object(
+                self.CACHE_KEY, STATIC_STATS, ttl=settings.stats_cache_ttl
+            )
+        except Exception as e:
+            logger.warning(f"Stats cache unavailable, serving in-process copy: {e}")
+            return self._local
         return STATIC_STATS
 
     async def refresh_cache(self, new_data: dict):
         """Update cached stats (called by update script)."""
-        await redis_client.set_cached(
-            self.CACHE_KEY,
-            json.dumps(new_data),
-            ttl=settings.stats_cache_ttl,
+        await redis_client.set_object(
+            self.CACHE_KEY, new_data, ttl=settings.stats_cache_ttl
         )
 
 
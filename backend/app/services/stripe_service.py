@@ -2,12 +2,21 @@
 Stripe Service - subscription management.
 
 Handles:
-  - Creating checkout sessions
-  - Processing webhooks
+  - Creating checkout and billing portal sessions
+  - Verifying webhooks and applying their events (see WebhookInbox)
   - Syncing subscription state to DB
+
+All Stripe API calls go through the SDK's async methods on a shared
+StripeClient backed by one httpx.AsyncClient, so they never block the
+event loop and reuse connections. Set STRIPE_API_BASE to point at a
+local stripe-mock for testing.
+
+The stripe package takes over a second to import, so it is loaded on
+first use rather than at startup.
 """
 
-import stripe
+from typing import TYPE_CHECKING
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -15,7 +24,8 @@ from app.core.config import settings
 from app.models.user import User
 from app.models.subscription import Subscription
 
-stripe.api_key = settings.stripe_secret_key
+if TYPE_CHECKING:
+    import stripe
 
 # Map Stripe price IDs to tier names
 PRICE_TO_TIER = {
@@ -27,44 +37,97 @@ PRICE_TO_TIER = {
 class StripeService:
     """Manages Stripe interactions."""
 
+    def __init__(self):
+        self._client: "stripe.StripeClient | None" = None
+        self._http: "stripe.HTTPXClient | None" = None
+
+    @property
+    def client(self) -> "stripe.StripeClient":
+        if not self._client:
+            import stripe
+
+            self._http = stripe.HTTPXClient(timeout=settings.stripe_timeout)
+            base_addresses = {"api": settings.stripe_api_base} if settings.stripe_api_base else {}
+            self._client = stripe.StripeClient(
+                settings.stripe_secret_key,
+                http_client=self._http,
+                max_network_retries=settings.stripe_max_retries,
+                base_addresses=base_addresses,
+            )
+        return self._client
+
+    async def close(self):
+        if self._http:
+            await self._http.close_async()
+            self._http = None
+            self._client = None
+
     async def create_checkout_session(
         self, user_id: str, email: str, price_id: str, success_url: str, cancel_url: str
     ) -> str:
         """Create a Stripe Checkout session. Returns the session URL."""
-        session = stripe.checkout.Session.create(
-            mode="subscription",
-            customer_email=email,
-            line_items=[{"price": price_id, "quantity": 1}],
-            success_url=success_url,
-            cancel_url=cancel_url,
-            metadata={"user_id": user_id},
-        )
+        session = await self.client.checkout.sessions.create_async(params={
+            "mode": "subscription",
+            "customer_email": email,
+            "line_items": [{"price": price_id, "quantity": 1}],
+            "success_url": success_url,
+            "cancel_url": cancel_url,
+            "metadata": {"user_id": user_id},
+        })
         return session.url
 
-    async def handle_webhook_event(
-        self, payload: bytes, sig_header: str, db: AsyncSession
-    ) -> dict:
-        """Process Stripe webhook event."""
-        event = stripe.Webhook.construct_event(
+    async def create_portal_session(self, customer_id: str, return_url: str) -> str:
+        """Create a billing portal session. Returns the session URL."""
+        session = await self.client.billing_portal.sessions.create_async(params={
+            "customer": customer_id,
+            "return_url": return_url,
+        })
+        return session.url
+
+    def verify_event(self, payload: bytes, sig_header: str) -> "stripe.Event":
+        """Check the webhook signature and parse the event. Raises on failure."""
+        import stripe
+
+        return stripe.Webhook.construct_event(
             payload, sig_header, settings.stripe_webhook_secret
         )
 
+    async def fetch_event_data(self, event: "stripe.Event") -> "stripe.Subscription | None":
+        """
+        Fetch whatever apply_event() needs from the Stripe API. Kept separate
+        so callers can make the network call outside a DB transaction.
+        """
         if event.type == "checkout.session.completed":
-            await self._handle_checkout_complete(event.data.object, db)
+            session = event.data.object
+            if session.metadata.get("user_id"):
+                return await self.client.subscriptions.retrieve_async(session.subscription)
+        return None
+
+    async def apply_event(
+        self, event: "stripe.Event", db: AsyncSession, fetched: "stripe.Subscription | None" = None
+    ) -> str | None:
+        """
+        Apply a subscription event to the DB without committing.
+        `fetched` is the result of fetch_event_data() for the event.
+        Handlers are idempotent, so redelivered or retried events are safe.
+        Returns the user whose tier changed, if any.
+        """
+        if event.type == "checkout.session.completed":
+            return await self._handle_checkout_complete(event.data.object, fetched, db)
         elif event.type == "customer.subscription.updated":
-            await self._handle_subscription_update(event.data.object, db)
+            return await self._handle_subscription_update(event.data.object, db)
         elif event.type == "customer.subscription.deleted":
-            await self._handle_subscription_cancel(event.data.object, db)
-
-        return {"event": event.type, "processed": True}
+            return await self._handle_subscription_cancel(event.data.object, db)
+        return None
 
-    async def _handle_checkout_complete(self, session, db: AsyncSession):
-        """New subscription created."""
+    async def _handle_checkout_complete(self, session, sub, db: AsyncSession) -> str | None:
+        """New subscription created. Returns the user whose tier changed."""
         user_id = session.metadata.get("user_id")
         if not user_id:
-            return
+            return None
 
-        sub = stripe.Subscription.retrieve(session.subscription)
+        if sub is None:
+            sub = await self.client.subscriptions.retrieve_async(session.subscription)
         price_id = sub["items"]["data"][0]["price"]["id"]
         tier = PRICE_TO_TIER.get(price_id, "hunter")
 
@@ -74,18 +137,22 @@ class StripeService:
             user.tier = tier
             user.stripe_customer_id = session.customer
 
-        # Create subscription record
-        db_sub = Subscription(
-            user_id=user_id,
-            stripe_subscription_id=sub.id,
-            stripe_price_id=price_id,
-            status=sub.status,
-            tier=tier,
+        # Create or replace the user's subscription record (one per user)
+        result = await db.execute(
+            select(Subscription).where(Subscription.user_id == user_id)
         )
-        db.add(db_sub)
-
-    async def _handle_subscription_update(self, sub, db: AsyncSession):
-        """Subscription updated (upgrade/downgrade/renewal)."""
+        db_sub = result.scalar_one_or_none()
+        if db_sub is None:
+            db_sub = Subscription(user_id=user_id)
+            db.add(db_sub)
+        db_sub.stripe_subscription_id = sub.id
+        db_sub.stripe_price_id = price_id
+        db_sub.status = sub.status
+        db_sub.tier = tier
+        return user_id
+
+    async def _handle_subscription_update(self, sub, db: AsyncSession) -> str | None:
+        """Subscription updated (upgrade/downgrade/renewal). Returns the user whose tier changed."""
         result = await db.execute(
             select(Subscription).where(
                 Subscription.stripe_subscription_id == sub.id
@@ -101,9 +168,11 @@ class StripeService:
             user = await db.get(User, db_sub.user_id)
             if user:
                 user.tier = db_sub.tier
+                return user.id
+        return None
 
-    async def _handle_subscription_cancel(self, sub, db: AsyncSession):
-        """Subscription canceled."""
+    async def _handle_subscription_cancel(self, sub, db: AsyncSession) -> str | None:
+        """Subscription canceled. Returns the user whose tier changed."""
         result = await db.execute(
             select(Subscription).where(
                 Subscription.stripe_subscription_id == sub.id
@@ -115,6 +184,8 @@ class StripeService:
             user = await db.get(User, db_sub.user_id)
             if user:
                 user.tier = "ghost"
+                return user.id
+        return None
 
 
 stripe_service = StripeService()
@@ -0,0 +1,339 @@
+"""
+Usage Ledger - per user, per day, per model token and cost accounting.
+
+Every model call is recorded with record(), which atomically (MULTI)
+increments a Redis hash per user and UTC day:
+
+    usage:{day}:{user_id}    {model}|calls, {model}|input_tokens, ...,
+                             {model}|cost_micros, total (all tokens)
+
+and adds the hash's key to the usage:dirty set. The hashes only hold
+deltas not yet in Postgres. A background task in every worker pops
+dirty keys every USAGE_FLUSH_INTERVAL seconds, reads and deletes their
+hashes in one MULTI, and adds the amounts to token_usage. If the upsert
+fails the amounts are added back to Redis. Nothing depends on a hash
+outliving its flush, so an evicted hash loses only its unflushed delta.
+Hashes expire two days after their day ends, which leaves time for the
+last flush.
+
+check_budget() enforces TOKEN_BUDGET_* per tier before a scan reaches
+the model. Today's usage is the token_usage rows plus the unflushed
+delta, so concurrent scans can overshoot a budget by at most one scan
+each.
+
+While Redis is down, usage is counted in-process, budgets shrink to
+REDIS_DEGRADED_LIMIT_FRACTION (as for scan limits, see rate_limiter),
+and the local counts are added to Redis once it is back.
+"""
+
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from contextlib import suppress
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.metrics import SCAN_COST, TOKEN_BUDGET_REJECTIONS
+from app.core.redis import redis_client
+from app.models.token_usage import TokenUsage
+
+logger = logging.getLogger(__name__)
+
+# Same order as the MODEL_PRICES lists
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_write_tokens", "cache_read_tokens")
+LEDGER_FIELDS = ("calls", *TOKEN_FIELDS, "cost_micros")
+
+TIER_BUDGETS = {
+    "ghost": settings.token_budget_free,
+    "hunter": settings.token_budget_hunter,
+    "operator": settings.token_budget_operator,
+}
+
+DIRTY_KEY = "usage:dirty"
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _key(user_id: str, day: date) -> str:
+    return f"usage:{day.isoformat()}:{user_id}"
+
+
+def estimate_cost_micros(model: str, tokens: dict[str, int]) -> int:
+    """Cost in millionths of a USD. Tokens x USD per million tokens = micro-USD."""
+    prices = settings.model_prices.get(model)
+    if not prices:
+        return 0
+    return round(sum(tokens.get(field, 0) * price for field, price in zip(TOKEN_FIELDS, prices)))
+
+
+class UsageLedger:
+    """Counts model tokens per user in Redis and persists them to Postgres."""
+
+    def __init__(self):
+        # (user_id, day, model) -> field amounts counted while Redis was unavailable
+        self._local: defaultdict[tuple[str, date, str], Counter] = defaultdict(Counter)
+        self._task: asyncio.Task | None = None
+
+    async def record(self, user_id: str, model: str, tokens: dict[str, int]):
+        """Add one model call's tokens (keyed by TOKEN_FIELDS) to today's ledger."""
+        amounts = {field: tokens.get(field, 0) for field in TOKEN_FIELDS}
+        amounts["calls"] = 1
+        amounts["cost_micros"] = estimate_cost_micros(model, tokens)
+        SCAN_COST.labels(model).inc(amounts["cost_micros"] / 1_000_000)
+
+        day = _today()
+        if redis_client.available:
+            try:
+                await self._increment(user_id, day, model, amounts)
+                return
+            except Exception as e:
+                logger.warning(f"Usage ledger unavailable, counting locally: {e}")
+        self._local[(user_id, day, model)].update(amounts)
+
+    async def _increment(self, user_id: str, day: date, model: str, amounts: dict[str, int]):
+        key = _key(user_id, day)
+        expires = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(days=3)
+        async with redis_client.pipeline(transaction=True, retry=False) as pipe:
+            for field, amount in amounts.items():
+                if amount:
+                    pipe.hincrby(key, f"{model}|{field}", amount)
+            pipe.hincrby(key, "total", sum(amounts[field] for field in TOKEN_FIELDS))
+            pipe.expireat(key, expires)
+            pipe.sadd(DIRTY_KEY, key)
+            await redis_client.tracked(pipe.execute())
+
+    def _local_tokens(self, user_id: str, day: date) -> int:
+        return sum(
+            sum(counts[field] for field in TOKEN_FIELDS)
+            for (uid, d, _), counts in self._local.items()
+            if uid == user_id and d == day
+        )
+
+    async def _flushed_tokens(self, user_id: str, day: date) -> int:
+        """Tokens already persisted to token_usage for one day, all models."""
+        async with async_session() as db:
+            total = await db.scalar(
+                select(func.sum(
+                    TokenUsage.input_tokens + TokenUsage.output_tokens
+                    + TokenUsage.cache_write_tokens + TokenUsage.cache_read_tokens
+                ))
+                .where(TokenUsage.user_id == user_id, TokenUsage.day == day)
+            )
+        return int(total or 0)
+
+    async def tokens_today(self, user_id: str) -> tuple[int, bool]:
+        """(tokens used today, whether Redis was down so only local deltas are counted)."""
+        today = _today()
+        pending, degraded = 0, True
+        # Redis before Postgres: a flush in between is counted twice, never missed
+        if redis_client.available:
+            try:
+                pending = int(await redis_client.tracked(
+                    redis_client.client.hget(_key(user_id, today), "total")
+                ) or 0)
+                degraded = False
+            except Exception as e:
+                logger.warning(f"Usage ledger unavailable, using local usage: {e}")
+        try:
+            flushed = await self._flushed_tokens(user_id, today)
+        except Exception as e:
+            logger.warning(f"Flushed token usage unavailable: {e}")
+            flushed = 0
+        return flushed + pending + self._local_tokens(user_id, today), degraded
+
+    async def budget(self, user_id: str, tier: str) -> dict | None:
+        """Today's token budget as used/limit/remaining, or None if the tier has none."""
+        limit = TIER_BUDGETS.get(tier, 0)
+        if limit <= 0:
+            return None
+        used, degraded = await self.tokens_today(user_id)
+        if degraded:
+            limit = max(1, int(limit * settings.redis_degraded_limit_fraction))
+        return {"used": used, "limit": limit, "remaining": max(0, limit - used)}
+
+    async def check_budget(self, user_id: str, tier: str):
+        """Raise 429 if the user's daily token budget is already spent."""
+        budget = await self.budget(user_id, tier)
+        if budget and budget["remaining"] <= 0:
+            TOKEN_BUDGET_REJECTIONS.labels(tier).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Daily token budget reached ({budget['limit']} tokens/day for {tier} tier)",
+            )
+
+    async def reconcile_local(self):
+        """Fold usage counted during an outage into Redis."""
+        pending = list(self._local.items())
+        self._local.clear()
+        for (user_id, day, model), counts in pending:
+            try:
+                await self._increment(user_id, day, model, dict(counts))
+            except Exception as e:
+                logger.warning(f"Could not reconcile token usage for {user_id}: {e}")
+                self._local[(user_id, day, model)].update(counts)
+
+    # ── Persistence ─────────────────────────────────────────────────
+
+    async def start(self):
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run(), name="usage-ledger")
+
+    async def stop(self):
+        """Stop the flusher after one last flush."""
+        if not self._task:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        try:
+            if self._local and redis_client.available:
+                await self.reconcile_local()
+            await self.flush()
+        except Exception:
+            logger.exception("Final usage ledger flush failed")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.usage_flush_interval)
+            try:
+                # Deltas a failed flush could not put back into Redis
+                if self._local and redis_client.available:
+                    await self.reconcile_local()
+                # A full batch means there is probably more waiting
+                while await self.flush() >= settings.usage_flush_batch_size:
+                    pass
+            except Exception:
+                logger.exception("Usage ledger flush failed")
+
+    async def flush(self) -> int:
+        """Move one batch of Redis deltas into token_usage. Returns keys flushed."""
+        if not redis_client.available:
+            return 0
+        keys = await redis_client.tracked(
+            redis_client.client.spop(DIRTY_KEY, settings.usage_flush_batch_size)
+        )
+        if not keys:
+            return 0
+        try:
+            # Read and reset together, so no increment lands between the two.
+            # Not retried: a replay after a lost reply would read empty hashes
+            async with redis_client.pipeline(transaction=True, retry=False) as pipe:
+                for key in keys:
+                    pipe.hgetall(key)
+                    pipe.delete(key)
+                hashes = (await redis_client.tracked(pipe.execute()))[::2]
+        except BaseException:
+            # Still in Redis: put the keys back for the next flush
+            with suppress(Exception):
+                await redis_client.client.sadd(DIRTY_KEY, *keys)
+            raise
+
+        rows = []
+        for key, fields in zip(keys, hashes):
+            _, day, user_id = key.split(":", 2)
+            per_model: defaultdict[str, dict[str, int]] = defaultdict(dict)
+            for name, value in fields.items():
+                if "|" in name:
+                    model, field = name.rsplit("|", 1)
+                    per_model[model][field] = int(value)
+            rows.extend(
+                {
+                    "user_id": user_id,
+                    "day": date.fromisoformat(day),
+                    "model": model,
+                    **{field: counts.get(field, 0) for field in LEDGER_FIELDS},
+                }
+                for model, counts in per_model.items()
+            )
+        try:
+            if rows:
+                await self._upsert(rows)
+        except BaseException:
+            # The deltas now only exist here: keep them and hand them back to Redis
+            for row in rows:
+                self._local[(row["user_id"], row["day"], row["model"])].update(
+                    {field: row[field] for field in LEDGER_FIELDS}
+                )
+            raise
+        return len(keys)
+
+    async def _upsert(self, rows: list[dict]):
+        stmt = insert(TokenUsage).values(rows)
+        table = TokenUsage.__table__
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TokenUsage.user_id, TokenUsage.day, TokenUsage.model],
+            set_={
+                # Rows carry deltas, so concurrent flushes from other workers add up
+                **{field: table.c[field] + stmt.excluded[field] for field in LEDGER_FIELDS},
+                "updated_at": func.now(),
+            },
+        )
+        async with async_session() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    # ── Reading ─────────────────────────────────────────────────────
+
+    async def daily(self, db: AsyncSession, user_id: str, days: int) -> list[dict]:
+        """
+        Per day and model totals for the last `days` UTC days, newest first.
+        Postgres holds flushed totals; unflushed Redis deltas for today and
+        yesterday and any local counts are added so the result is current.
+        """
+        today = _today()
+        result = await db.execute(
+            select(TokenUsage)
+            .where(
+                TokenUsage.user_id == user_id,
+                TokenUsage.day > today - timedelta(days=days),
+            )
+        )
+        ledger = {
+            (row.day, row.model): {field: getattr(row, field) for field in LEDGER_FIELDS}
+            for row in result.scalars()
+        }
+
+        if redis_client.available:
+            # Yesterday's last deltas may not have been flushed yet
+            live_days = [today - timedelta(days=i) for i in range(min(days, 2))]
+            try:
+                async with redis_client.pipeline() as pipe:
+                    for day in live_days:
+                        pipe.hgetall(_key(user_id, day))
+                    hashes = await redis_client.tracked(pipe.execute())
+            except Exception as e:
+                logger.warning(f"Live token usage unavailable: {e}")
+                hashes = []
+            for day, fields in zip(live_days, hashes):
+                for name, value in fields.items():
+                    if "|" not in name:
+                        continue
+                    model, field = name.rsplit("|", 1)
+                    counts = ledger.setdefault((day, model), dict.fromkeys(LEDGER_FIELDS, 0))
+                    counts[field] += int(value)
+
+        for (uid, day, model), local in self._local.items():
+            if uid != user_id or day <= today - timedelta(days=days):
+                continue
+            counts = ledger.setdefault((day, model), dict.fromkeys(LEDGER_FIELDS, 0))
+            for field in LEDGER_FIELDS:
+                counts[field] += local[field]
+
+        return [
+            {"day": day, "model": model, **counts}
+            for (day, model), counts in sorted(ledger.items(), key=lambda e: e[0], reverse=True)
+        ]
+
+
+usage_ledger = UsageLedger()
+redis_client.on_recovery(usage_ledger.reconcile_local)
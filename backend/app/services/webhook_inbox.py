@@ -0,0 +1,203 @@
+"""
+Webhook Inbox - durable, asynchronous Stripe event processing.
+
+The webhook endpoint verifies the signature, stores the event in
+webhook_events (keyed by Stripe event id, so redeliveries are ignored)
+and acks immediately. A background task in every worker then:
+  - Claims due events with FOR UPDATE SKIP LOCKED and leases them by
+    moving next_attempt_at WEBHOOK_LEASE_SECONDS ahead, so workers never
+    process the same event twice; an event whose worker died is picked
+    up again once its lease runs out
+  - Only claims a customer's oldest unfinished event, so events for one
+    customer are applied in Stripe's order
+  - Fetches anything the event needs from Stripe outside a transaction,
+    then applies it in a savepoint via StripeService.apply_event() and
+    commits, one short transaction per event
+  - Retries failures with exponential backoff, and marks an event
+    "dead" after WEBHOOK_MAX_ATTEMPTS for manual inspection
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.tiers import tier_resolver
+from app.models.webhook_event import WebhookEvent
+from app.services.stripe_service import stripe_service
+
+if TYPE_CHECKING:
+    import stripe
+
+logger = logging.getLogger(__name__)
+
+
+def _claim_due_events(limit: int):
+    """Due pending events that have no earlier unfinished event for the same customer."""
+    earlier = aliased(WebhookEvent)
+    blocked = (
+        select(earlier.id)
+        .where(
+            earlier.customer_id == WebhookEvent.customer_id,
+            earlier.status == "pending",
+            tuple_(earlier.event_created, earlier.id)
+            < tuple_(WebhookEvent.event_created, WebhookEvent.id),
+        )
+        .exists()
+    )
+    return (
+        select(WebhookEvent)
+        .where(
+            WebhookEvent.status == "pending",
+            WebhookEvent.next_attempt_at <= func.now(),
+            ~blocked,
+        )
+        .order_by(WebhookEvent.event_created, WebhookEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+class WebhookInbox:
+    """Stores verified webhook events and processes them in the background."""
+
+    def __init__(self):
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    async def store(self, event: "stripe.Event", payload: bytes, db: AsyncSession) -> bool:
+        """Persist a verified event and commit. Returns False for a redelivery."""
+        obj = event.data.object
+        customer = obj.get("customer")
+        result = await db.execute(
+            insert(WebhookEvent)
+            .values(
+                id=event.id,
+                type=event.type,
+                customer_id=customer if isinstance(customer, str) else None,
+                payload=payload.decode(),
+                status="pending",
+                attempts=0,
+                event_created=datetime.fromtimestamp(event.created, tz=timezone.utc),
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+        await db.commit()
+        if self._wakeup:
+            self._wakeup.set()
+        return result.rowcount > 0
+
+    async def start(self):
+        if self._task:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="webhook-inbox")
+
+    async def stop(self):
+        """Stop processing. Interrupted events are retried when their lease expires."""
+        if not self._task:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.process_due()
+            except Exception:
+                logger.exception("Webhook inbox poll failed")
+                processed = 0
+            # A full batch means there is probably more waiting
+            if processed >= settings.webhook_batch_size:
+                continue
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.webhook_poll_interval
+                )
+            self._wakeup.clear()
+
+    async def process_due(self) -> int:
+        """Claim and process one batch of due events. Returns how many were claimed."""
+        claimed = await self._claim()
+        for event_id, attempt, payload in claimed:
+            user_id = await self._process(event_id, attempt, payload)
+            # After commit, so no reader can re-cache the old tier
+            if user_id:
+                await tier_resolver.invalidate(user_id)
+        return len(claimed)
+
+    async def _claim(self) -> list[tuple[str, int, str]]:
+        """Lease a batch of due events. Returns (id, attempt, payload) for each."""
+        lease_until = datetime.now(timezone.utc) + timedelta(seconds=settings.webhook_lease_seconds)
+        async with async_session() as db:
+            async with db.begin():
+                events = (
+                    await db.execute(_claim_due_events(settings.webhook_batch_size))
+                ).scalars().all()
+                for row in events:
+                    row.attempts += 1
+                    row.next_attempt_at = lease_until
+                return [(row.id, row.attempts, row.payload) for row in events]
+
+    async def _process(self, event_id: str, attempt: int, payload: str) -> str | None:
+        """Apply one leased event and record the outcome. Returns the user whose tier changed."""
+        import stripe
+
+        error: Exception | None = None
+        try:
+            event = stripe.Event.construct_from(json.loads(payload), settings.stripe_secret_key)
+            # No transaction is open here, so no row locks are held while Stripe answers
+            fetched = await stripe_service.fetch_event_data(event)
+        except Exception as e:
+            error = e
+
+        user_id = None
+        async with async_session() as db:
+            async with db.begin():
+                row = await db.get(WebhookEvent, event_id, with_for_update=True)
+                if row is None or row.status != "pending" or row.attempts != attempt:
+                    # The lease ran out and another worker has taken the event over
+                    logger.warning(f"Webhook {event_id} lease lost, skipping")
+                    return None
+                if error is None:
+                    try:
+                        async with db.begin_nested():
+                            user_id = await stripe_service.apply_event(event, db, fetched)
+                    except Exception as e:
+                        error = e
+                self._record(row, error)
+        return None if error else user_id
+
+    def _record(self, row: WebhookEvent, error: Exception | None):
+        now = datetime.now(timezone.utc)
+        if error is None:
+            row.status = "done"
+            row.last_error = None
+            row.processed_at = now
+            return
+
+        row.last_error = f"{type(error).__name__}: {error}"[:2000]
+        if row.attempts >= settings.webhook_max_attempts:
+            row.status = "dead"
+            logger.error(f"Webhook {row.id} ({row.type}) dead after {row.attempts} attempts: {error}")
+        else:
+            delay = min(
+                settings.webhook_retry_base_seconds * 2 ** (row.attempts - 1),
+                settings.webhook_retry_max_seconds,
+            )
+            row.next_attempt_at = now + timedelta(seconds=delay)
+            logger.warning(f"Webhook {row.id} ({row.type}) failed, retry in {delay}s: {error}")
+
+
+webhook_inbox = WebhookInbox()
@@ -0,0 +1,13 @@
+"""
+Gunicorn worker class for production (see gunicorn.conf.py).
+
+Same as uvicorn's worker but pins the fast implementations instead of
+"auto", so a missing uvloop/httptools fails loudly rather than silently
+falling back to asyncio/h11.
+"""
+
+from uvicorn_worker import UvicornWorker
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
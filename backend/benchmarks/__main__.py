@@ -0,0 +1,27 @@
+"""
+Run every micro-benchmark and print one JSON document.
+
+    cd backend && python -m benchmarks > micro.json
+
+The load test is separate: python -m benchmarks.load --help
+"""
+
+import json
+
+from benchmarks import (
+    bench_jwt, bench_responses, bench_scanner, bench_serializers, bench_startup,
+)
+
+
+def main():
+    print(json.dumps({
+        "jwt": bench_jwt.run(),
+        "responses": bench_responses.run(),
+        "scanner": bench_scanner.run(),
+        "serializers": bench_serializers.run(),
+        "startup": bench_startup.run(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
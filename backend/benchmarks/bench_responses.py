@@ -0,0 +1,118 @@
+"""
+Response serialization micro-benchmark, per hot endpoint.
+
+For each endpoint, times turning the handler's data into response bytes:
+  - before:       what the endpoint did previously (per-row model_validate,
+                  FastAPI's jsonable_encoder / response_model re-validation,
+                  stdlib json via JSONResponse)
+  - orjson_default: the same with ORJSONResponse as the default class only
+  - now:          app.core.responses (one TypeAdapter pass straight to
+                  bytes, or orjson directly for schemaless stats)
+
+    cd backend && python -m benchmarks.bench_responses
+"""
+
+import asyncio
+import json
+import os
+import timeit
+from datetime import datetime, timezone
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret-" + "x" * 32)
+os.environ.setdefault("INTERNAL_API_SECRET", "benchmark-internal-" + "x" * 32)
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.responses import raw_response, typed_response  # noqa: E402
+from app.models.scan import Scan  # noqa: E402
+from app.schemas.scan import (  # noqa: E402
+    SCAN_HISTORY, SCAN_RESPONSE, ScanResponse, ScanResult, ScanUsage,
+)
+from app.services.stats_service import STATIC_STATS  # noqa: E402
+
+ITERATIONS = 500
+
+
+def _rows(n: int) -> list[Scan]:
+    """Transient ORM rows shaped like a page of real history."""
+    return [
+        Scan(
+            id=f"00000000-0000-4000-8000-{i:012d}",
+            user_id="user-123",
+            url=f"https://example.com/articles/{i}/a-fairly-long-slug-for-this-post",
+            ai_probability=0.731,
+            verdict="ai_generated",
+            analysis="Repetitive hedging and generic transitions suggest machine generation.",
+            content_snippet="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8,
+            model_used="claude-sonnet-4-20250514",
+            scan_duration_ms=2400 + i,
+            created_at=datetime(2026, 10, 1, 12, 0, i % 60, tzinfo=timezone.utc),
+        )
+        for i in range(n)
+    ]
+
+
+def _per_call_us(fn, number: int = ITERATIONS) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def run() -> dict:
+    loop = asyncio.new_event_loop()
+    rows = _rows(100)
+    usage = {"used": 3, "limit": 100, "remaining": 97}
+    scan_field = create_model_field("Response_scan", ScanResponse, mode="serialization")
+
+    def encoded(response_class, content, field=None):
+        data = loop.run_until_complete(
+            serialize_response(field=field, response_content=content)
+        )
+        return response_class(data).body
+
+    def history_before(response_class=JSONResponse):
+        return encoded(response_class, {
+            "scans": [ScanResult.model_validate(s) for s in rows],
+            "total": 100, "limit": 100, "next_cursor": None,
+        })
+
+    def history_now():
+        return typed_response(SCAN_HISTORY, {
+            "scans": rows, "total": 100, "limit": 100, "next_cursor": None,
+        }).body
+
+    def scan_before(response_class=JSONResponse):
+        content = ScanResponse(result=ScanResult.model_validate(rows[0]), usage=ScanUsage(**usage))
+        return encoded(response_class, content, scan_field)
+
+    def scan_now():
+        return typed_response(SCAN_RESPONSE, {"result": rows[0], "usage": usage}).body
+
+    def stats_before(response_class=JSONResponse):
+        return encoded(response_class, STATIC_STATS)
+
+    def stats_now():
+        return raw_response(STATIC_STATS).body
+
+    # Same document either way (modulo datetime formatting)
+    assert json.loads(history_now())["scans"][0]["id"] == rows[0].id
+
+    results = {}
+    for name, before, now in (
+        ("history_100", history_before, history_now),
+        ("scan", scan_before, scan_now),
+        ("stats", stats_before, stats_now),
+    ):
+        results[name] = {
+            "before_us": round(_per_call_us(before), 1),
+            "orjson_default_us": round(_per_call_us(lambda: before(ORJSONResponse)), 1),
+            "now_us": round(_per_call_us(now), 1),
+            "bytes": len(now()),
+        }
+    loop.close()
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
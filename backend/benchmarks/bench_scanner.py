@@ -0,0 +1,61 @@
+"""
+Scanner micro-benchmark.
+
+Times the CPU-bound parts of a scan on a ~30KB stub article:
+extract_text(), sanitize_content(), and fetch_content() end to end over
+an in-memory httpx transport (URL validation skipped, no network).
+
+    cd backend && python -m benchmarks.bench_scanner
+"""
+
+import asyncio
+import json
+import os
+import timeit
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret-" + "x" * 32)
+os.environ.setdefault("INTERNAL_API_SECRET", "benchmark-internal-" + "x" * 32)
+
+import httpx  # noqa: E402
+
+from app.services import scanner_service as scanner  # noqa: E402
+from benchmarks.stubs import _page  # noqa: E402
+
+ITERATIONS = 500
+
+
+def _per_call_us(fn, number: int = ITERATIONS) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def run() -> dict:
+    html = _page(1)
+    text = scanner.extract_text(html)
+
+    service = scanner.ScannerService()
+    service._http = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, html=html)
+        )
+    )
+    validate_url = scanner.validate_url
+    scanner.validate_url = lambda url: url  # No DNS in a micro-benchmark
+    loop = asyncio.new_event_loop()
+    try:
+        results = {
+            "page_bytes": len(html),
+            "extract_text_us": _per_call_us(lambda: scanner.extract_text(html)),
+            "sanitize_content_us": _per_call_us(lambda: scanner.sanitize_content(text)),
+            "fetch_content_us": _per_call_us(
+                lambda: loop.run_until_complete(service.fetch_content("https://stub.invalid/a"))
+            ),
+        }
+    finally:
+        scanner.validate_url = validate_url
+        loop.run_until_complete(service.http.aclose())
+        loop.close()
+    return {name: round(value, 2) for name, value in results.items()}
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
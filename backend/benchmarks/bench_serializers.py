@@ -0,0 +1,77 @@
+"""
+Cache serializer micro-benchmark.
+
+Encodes and decodes representative cache payloads with every serializer,
+with and without zstd, and reports per-call time and stored bytes
+(header byte included).
+
+    cd backend && python -m benchmarks.bench_serializers
+"""
+
+import json
+import os
+import timeit
+from datetime import datetime, timezone
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret-" + "x" * 32)
+os.environ.setdefault("INTERNAL_API_SECRET", "benchmark-internal-" + "x" * 32)
+
+from app.core.serializers import SERIALIZER_CLASSES, Codec  # noqa: E402
+from app.services.stats_service import STATIC_STATS  # noqa: E402
+
+ITERATIONS = 2000
+
+
+def _scan_results(n: int = 50) -> list[dict]:
+    """Roughly what a cached page of scan results looks like."""
+    return [
+        {
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "url": f"https://example.com/articles/{i}/a-fairly-long-slug-for-this-post",
+            "ai_probability": 0.731 + i / 1000,
+            "verdict": "likely_ai",
+            "analysis": "Repetitive hedging, uniform sentence length and generic "
+                        "transitions suggest machine generation. " * 3,
+            "content_snippet": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8,
+            "model_used": "claude-sonnet-4-20250514",
+            "tokens_used": 1830 + i,
+            "scan_duration_ms": 2400 + i,
+            "created_at": datetime(2026, 10, 1, 12, 0, i % 60, tzinfo=timezone.utc).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+PAYLOADS = {
+    "stats_global": STATIC_STATS,
+    "scan_results_50": _scan_results(),
+}
+
+
+def _per_call_us(fn) -> float:
+    return min(timeit.repeat(fn, number=ITERATIONS, repeat=5)) / ITERATIONS * 1e6
+
+
+def run() -> dict:
+    results = {}
+    for payload_name, payload in PAYLOADS.items():
+        for name in SERIALIZER_CLASSES:
+            for compress in (False, True):
+                codec = Codec(name, compress_min_bytes=1 if compress else 0)
+                if codec.serializer.name != name:
+                    continue  # package not installed
+                if compress and not codec._zstd:
+                    continue
+                data = codec.encode(payload)
+                assert codec.decode(data) == payload
+                label = f"{payload_name}/{name}{'+zstd' if compress else ''}"
+                results[label] = {
+                    "bytes": len(data),
+                    "encode_us": round(_per_call_us(lambda: codec.encode(payload)), 2),
+                    "decode_us": round(_per_call_us(lambda: codec.decode(data)), 2),
+                }
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,78 @@
+"""
+Cold-start benchmark.
+
+Times `import app.main` in fresh interpreters (the part of boot that
+does not need Postgres or Redis), and lists the slowest top-level
+imports from `python -X importtime` so regressions are easy to spot.
+
+    cd backend && python -m benchmarks.bench_startup
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+RUNS = 5
+
+_ENV = {
+    **os.environ,
+    "JWT_SECRET": os.environ.get("JWT_SECRET", "benchmark-secret-" + "x" * 32),
+    "INTERNAL_API_SECRET": os.environ.get("INTERNAL_API_SECRET", "benchmark-internal-" + "x" * 32),
+}
+_IMPORTTIME = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| +(\S+)$")
+
+
+def _import_seconds() -> float:
+    code = (
+        "import time; t = time.perf_counter(); import app.main; "
+        "print(time.perf_counter() - t)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND, env=_ENV,
+        capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _slowest_imports(limit: int = 10) -> dict[str, float]:
+    """Cumulative ms of the slowest third-party packages."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND, env=_ENV, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in out.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        name = match.group(2)
+        if "." not in name and name != "app" and name not in sys.stdlib_module_names:
+            modules[name] = max(modules.get(name, 0), int(match.group(1)) / 1000)
+    slowest = sorted(modules.items(), key=lambda m: m[1], reverse=True)[:limit]
+    return {name: round(ms, 1) for name, ms in slowest}
+
+
+def run() -> dict:
+    _import_seconds()  # Fill the OS page cache and .pyc files first
+    times = [_import_seconds() for _ in range(RUNS)]
+    eager = subprocess.run(
+        [sys.executable, "-c", "import json, sys, app.main; print(json.dumps("
+         "[m for m in ('anthropic', 'stripe') if m in sys.modules]))"],
+        cwd=BACKEND, env=_ENV, capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    return {
+        "import_app_ms_median": round(statistics.median(times) * 1000, 1),
+        "import_app_ms_min": round(min(times) * 1000, 1),
+        # Should be [] - these SDKs load after startup (see app.core.warmup)
+        "eager_sdks": json.loads(eager),
+        "slowest_imports_ms": _slowest_imports(),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,32 @@
+"""
+Run the backend for load tests, with the stub servers reachable.
+
+Identical to `uvicorn app.main:app` except that the scanner's SSRF
+blocklist is emptied, so scans can fetch the stub target site on
+127.0.0.1. Benchmark use only.
+
+    cd backend && python -m benchmarks.serve --port 8100
+"""
+
+import argparse
+
+import uvicorn
+
+from app.services import scanner_service
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serve")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    scanner_service._BLOCKED_NETWORKS.clear()
+    scanner_service._BLOCKED_HOSTS.clear()
+
+    from app.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Stub upstream servers for offline benchmarks.
+
+One FastAPI app stands in for everything the backend calls out to:
+
+    POST /v1/messages                 Anthropic Messages API
+    GET  /v1/subscriptions/{id}       Stripe (checkout webhook handling)
+    POST /v1/checkout/sessions        Stripe Checkout
+    POST /v1/billing_portal/sessions  Stripe billing portal
+    GET  /site/{n}                    Target pages to scan
+
+Latencies are configurable so the backend sees realistic waits.
+
+    cd backend && python -m benchmarks.stubs --port 9100 --model-latency 0.8
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+
+PRICE_ID = "price_bench_operator"
+
+MODEL_LATENCY = 0.8
+SITE_LATENCY = 0.05
+
+app = FastAPI()
+
+_PARAGRAPH = (
+    "<p>In today's fast-paced digital landscape, it's important to note that "
+    "leveraging synergies can unlock unprecedented value. Furthermore, "
+    "stakeholders should delve into holistic strategies.</p>"
+)
+
+
+def _page(n: int) -> str:
+    """A ~30KB article with the script/style noise real pages carry."""
+    return (
+        f"<html><head><title>Article {n}</title>"
+        "<style>body{font-family:sans-serif}.x{color:red}</style>"
+        "<script>window.dataLayer=[];function gtag(){dataLayer.push(arguments)}</script>"
+        "</head><body><nav><a href='/'>Home</a></nav><article>"
+        + _PARAGRAPH * 120
+        + "</article><script>console.log('tracking')</script></body></html>"
+    )
+
+
+@app.post("/v1/messages")
+async def messages(body: dict):
+    await asyncio.sleep(MODEL_LATENCY * random.uniform(0.7, 1.3))
+    text = json.dumps({
+        "ai_probability": round(random.random(), 3),
+        "verdict": random.choice(["human", "mixed", "ai_generated"]),
+        "analysis": "Generic transitions and uniform sentence length.",
+        "signals": ["generic phrasing", "listicle structure"],
+    })
+    return {
+        "id": f"msg_bench_{random.getrandbits(48):x}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "stub"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 1200, "output_tokens": 90},
+    }
+
+
+@app.get("/v1/subscriptions/{sub_id}")
+async def subscription(sub_id: str):
+    return {
+        "id": sub_id,
+        "object": "subscription",
+        "status": "active",
+        "items": {"object": "list", "data": [{"price": {"id": PRICE_ID}}]},
+    }
+
+
+@app.post("/v1/checkout/sessions")
+async def checkout():
+    return {"id": "cs_bench", "object": "checkout.session", "url": "https://checkout.invalid/cs_bench"}
+
+
+@app.post("/v1/billing_portal/sessions")
+async def portal():
+    return {"id": "bps_bench", "object": "billing_portal.session", "url": "https://billing.invalid/bps_bench"}
+
+
+@app.get("/site/{n}", response_class=HTMLResponse)
+async def site(n: int):
+    await asyncio.sleep(SITE_LATENCY)
+    return _page(n)
+
+
+def main():
+    global MODEL_LATENCY, SITE_LATENCY
+    import uvicorn
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stubs")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--model-latency", type=float, default=MODEL_LATENCY)
+    parser.add_argument("--site-latency", type=float, default=SITE_LATENCY)
+    args = parser.parse_args()
+    MODEL_LATENCY, SITE_LATENCY = args.model_latency, args.site_latency
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
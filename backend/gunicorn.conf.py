@@ -0,0 +1,56 @@
+"""
+Gunicorn settings for the production API server.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+One uvicorn (uvloop + httptools) worker per available CPU by default;
+override with WEB_CONCURRENCY. Each worker runs the app lifespan on its
+own, which pre-warms its pools and clients before it accepts requests.
+
+On SIGTERM gunicorn stops accepting connections and gives workers
+GRACEFUL_TIMEOUT seconds to finish in-flight requests (scans can take
+tens of seconds) before lifespan shutdown drains the scan buffer.
+"""
+
+import os
+
+from prometheus_client import multiprocess
+
+
+def _cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))  # Respects container CPU pinning
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", _cpus()))
+worker_class = "app.worker.Worker"
+
+# Longer than the slowest scan (15s fetch + model call)
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "60"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+keepalive = 5
+
+# Recycle workers occasionally to cap slow memory growth; jitter avoids
+# every worker restarting at once
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Fresh directory for per-worker metric files (see app.core.metrics)
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
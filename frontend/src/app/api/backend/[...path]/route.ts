@@ -22,17 +22,45 @@ const JWT_SECRET = new TextEncoder().encode(JWT_SECRET_STR)
 // Allowed backend path prefixes to prevent open proxy
 const ALLOWED_PREFIXES = ['users/', 'scanner/', 'stats/']
 
+// W3C trace context, forwarded so backend spans join the caller's trace
+const TRACE_HEADERS = ['traceparent', 'tracestate', 'baggage']
+
+// Reuse signed tokens so the backend's verified-token cache gets hits.
+// Keyed by every claim we sign; a tier change produces a new token.
+const TOKEN_TTL_SECONDS = 3600
+const TOKEN_REUSE_MARGIN_SECONDS = 300
+const MAX_CACHED_TOKENS = 1000
+const tokenCache = new Map<string, { token: string; exp: number }>()
+
 async function createBackendToken(payload: Record<string, any>): Promise<string> {
-  return new jose.SignJWT({
+  const claims = {
     sub: payload.sub || payload.id,
     email: payload.email,
     name: payload.name,
     tier: payload.tier || 'ghost',
-  })
+  }
+  const key = JSON.stringify(claims)
+  const now = Math.floor(Date.now() / 1000)
+
+  const cached = tokenCache.get(key)
+  if (cached && cached.exp - now > TOKEN_REUSE_MARGIN_SECONDS) {
+    return cached.token
+  }
+
+  const exp = now + TOKEN_TTL_SECONDS
+  const token = await new jose.SignJWT(claims)
     .setProtectedHeader({ alg: 'HS256' })
-    .setIssuedAt()
-    .setExpirationTime('1h')
+    .setIssuedAt(now)
+    .setExpirationTime(exp)
     .sign(JWT_SECRET)
+
+  tokenCache.delete(key)
+  tokenCache.set(key, { token, exp })
+  if (tokenCache.size > MAX_CACHED_TOKENS) {
+    // Map preserves insertion order: drop the oldest entry
+    tokenCache.delete(tokenCache.keys().next().value as string)
+  }
+  return token
 }
 
 async function proxyRequest(req: NextRequest, pathSegments: string[]) {
@@ -50,6 +78,10 @@ async function proxyRequest(req: NextRequest, pathSegments: string[]) {
   const headers: Record<string, string> = {
     'Content-Type': 'application/json',
   }
+  for (const name of TRACE_HEADERS) {
+    const value = req.headers.get(name)
+    if (value) headers[name] = value
+  }
 
   // Decode NextAuth session, re-sign as simple HS256 JWT
   const sessionToken = await getToken({ req })
@@ -1,6 +1,6 @@
 /**
  * Scan History page - shows past scans for premium users.
- * Paginated, sorted by date, with verdict color coding.
+ * Cursor-paginated, sorted by date, with verdict color coding.
  */
 
 'use client'
@@ -42,21 +42,27 @@ export default function HistoryPage() {
   const { data: session, status } = useSession()
   const [scans, setScans] = useState<Scan[]>([])
   const [total, setTotal] = useState(0)
-  const [offset, setOffset] = useState(0)
+  // Cursors of every page visited so far; the last entry is the current page
+  const [cursors, setCursors] = useState<(string | null)[]>([null])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const limit = 20
 
+  const cursor = cursors[cursors.length - 1]
+  const offset = (cursors.length - 1) * limit
+
   useEffect(() => {
     if (status !== 'authenticated') return
     setLoading(true)
-    api.getScanHistory(limit, offset)
+    api.getScanHistory(limit, cursor)
       .then((data: any) => {
         setScans(data.scans || [])
         setTotal(data.total || 0)
+        setNextCursor(data.next_cursor || null)
       })
       .catch(console.error)
       .finally(() => setLoading(false))
-  }, [status, offset])
+  }, [status, cursor])
 
   if (status === 'loading') {
     return (
@@ -144,21 +150,21 @@ export default function HistoryPage() {
             </div>
 
             {/* Pagination */}
-            {total > limit && (
+            {(cursors.length > 1 || nextCursor) && (
               <div className="flex items-center justify-center gap-4 mt-6">
                 <button
-                  onClick={() => setOffset(Math.max(0, offset - limit))}
-                  disabled={offset === 0}
+                  onClick={() => setCursors(cursors.slice(0, -1))}
+                  disabled={cursors.length === 1}
                   className="font-mono text-sm text-dead-dim hover:text-dead-accent disabled:opacity-30 disabled:cursor-not-allowed transition-colors"
                 >
                   ← Prev
                 </button>
                 <span className="font-mono text-dead-muted text-xs">
-                  {offset + 1}–{Math.min(offset + limit, total)} of {total}
+                  {offset + 1}–{offset + scans.length} of {total}
                 </span>
                 <button
-                  onClick={() => setOffset(offset + limit)}
-                  disabled={offset + limit >= total}
+                  onClick={() => nextCursor && setCursors([...cursors, nextCursor])}
+                  disabled={!nextCursor}
                   className="font-mono text-sm text-dead-dim hover:text-dead-accent disabled:opacity-30 disabled:cursor-not-allowed transition-colors"
                 >
                   Next →
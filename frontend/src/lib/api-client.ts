@@ -74,8 +74,10 @@ class ApiClient {
     return this.authRequest<any>('/scanner/usage')
   }
 
-  async getScanHistory(limit = 20, offset = 0) {
-    return this.authRequest<any>(`/scanner/history?limit=${limit}&offset=${offset}`)
+  async getScanHistory(limit = 20, cursor?: string | null) {
+    const params = new URLSearchParams({ limit: String(limit) })
+    if (cursor) params.set('cursor', cursor)
+    return this.authRequest<any>(`/scanner/history?${params}`)
   }
 
   // --- User (auth, proxied) ---